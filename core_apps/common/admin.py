@@ -5,22 +5,23 @@ from django.contrib.contenttypes.admin import GenericInlineModelAdmin
 from django.http import HttpRequest
 from django.utils.translation import gettext_lazy as _
 
-from .models import ContentView
+from .models import ContentView, ContentViewDaily
 
 @admin.register(ContentView)
 class ContentViewAdmin(admin.ModelAdmin):
     """
     Admin configuration for ContentView model.
-    Provides a read-only interface to view and analyze content viewing patterns.
+    Provides a read-only interface to the raw views; date-based analysis is
+    done on the daily rollups (ContentViewDailyAdmin) instead.
     """
     # Display these fields as columns in the list view
     list_display = ['content_object', 'content_type', 'user', 'viewer_ip', 'last_viewed']
     
     # Enable filtering by these fields in the right sidebar
-    list_filter = ['content_type', 'last_viewed', 'created_at']
-    
-    # Enable date-based navigation
-    date_hierarchy = 'last_viewed'
+    list_filter = ['content_type']
+
+    # Skip the unfiltered COUNT(*) over the whole table on every page
+    show_full_result_count = False
     
     # Make all fields read-only since views should only be created programmatically
     readonly_fields = ['content_type', 'object_id', 'content_object', 'user', 'viewer_ip', 'created_at', 'updated_at']
@@ -46,6 +47,25 @@ class ContentViewAdmin(admin.ModelAdmin):
         """Disable editing of views through admin interface"""
         return False
 
+@admin.register(ContentViewDaily)
+class ContentViewDailyAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the daily view rollups.
+    Read-only, as rollups are built by the rollup_content_views task.
+    """
+    list_display = ['content_object', 'content_type', 'day', 'viewers', 'authenticated_viewers']
+    list_filter = ['content_type']
+    date_hierarchy = 'day'
+    readonly_fields = ['content_type', 'object_id', 'content_object', 'day', 'viewers', 'authenticated_viewers', 'created_at', 'updated_at']
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        """Disable manual creation of rollups through admin interface"""
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: Any = None) -> bool:
+        """Disable editing of rollups through admin interface"""
+        return False
+
 class ContentViewInline(GenericTabularInline):
     """
     Inline admin configuration for ContentView model.
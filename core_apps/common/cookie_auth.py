@@ -1,12 +1,17 @@
 from typing import Optional, Tuple
 
 from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from loguru import logger
 from rest_framework.request import Request
 from rest_framework_simplejwt.authentication import AuthUser, JWTAuthentication
-from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import Token
 
+from .token_denylist import is_token_revoked
+from .user_cache import cache_user, get_cached_user
+
 class CookieAuthentication(JWTAuthentication):
     def authenticate(self, request: Request) -> Optional[Tuple[AuthUser, Token]]:
         header = self.get_header(request)
@@ -21,4 +26,30 @@ class CookieAuthentication(JWTAuthentication):
                 return self.get_user(validated_token), validated_token
             except TokenError as e:
                 logger.error(f"Token validation failed: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        """
+        Validate the token and reject it if it has been revoked.
+        """
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token: Token) -> AuthUser:
+        """
+        Resolve the token's user from the user cache, loading it on a miss.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+        elif not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,144 @@
+"""
+Dirty-field tracking for models.
+
+DirtyFieldsMixin remembers the column values an instance was loaded with.
+On save() of an existing row it writes only the columns that changed (plus
+auto_now timestamps) through update_fields, and when nothing changed it
+skips the UPDATE, and with it the pre_save/post_save signals, entirely.
+
+Explicit saves keep Django's behaviour: inserts, force_insert/force_update
+and calls that pass update_fields are written as requested.
+"""
+
+import copy
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+from django.db import models
+
+_stats = {"skipped": 0, "partial": 0, "full": 0}
+_stats_lock = threading.Lock()
+
+_MUTABLE_TYPES = (dict, list, set)
+_MISSING = object()
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def get_save_stats() -> Dict[str, int]:
+    """
+    Return this process's save counters.
+
+    skipped: saves with no changed column, which issued no query
+    partial: saves narrowed to the changed columns
+    full: inserts and saves with caller-supplied update_fields or force flags
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+class DirtyFieldsMixin(models.Model):
+    """
+    Tracks changes to concrete fields and saves only what changed.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def refresh_from_db(self, using: Optional[str] = None, fields: Optional[Iterable[str]] = None, **kwargs: Any) -> None:
+        if fields is not None:
+            fields = list(fields)
+        super().refresh_from_db(using, fields, **kwargs)
+        if fields is None:
+            self._snapshot_fields()
+        else:
+            # Loading a deferred field must not mark other
+            # unsaved changes as clean
+            self._snapshot_fields(self._meta.get_field(name).attname for name in fields)
+
+    def _tracked_attnames(self) -> Iterable[str]:
+        return (field.attname for field in self._meta.concrete_fields if not field.primary_key)
+
+    def _snapshot_fields(self, attnames: Optional[Iterable[str]] = None) -> None:
+        """Remember the current values of `attnames` (default: all loaded fields)."""
+        # Deferred fields are not in __dict__ and are not snapshotted
+        if attnames is None:
+            self._loaded_values = {}
+            attnames = self._tracked_attnames()
+        elif getattr(self, "_loaded_values", None) is None:
+            return
+        for attname in attnames:
+            value = self.__dict__.get(attname, _MISSING)
+            if value is not _MISSING:
+                self._loaded_values[attname] = copy.deepcopy(value) if isinstance(value, _MUTABLE_TYPES) else value
+
+    def get_dirty_fields(self) -> Set[str]:
+        """
+        Return the attnames of fields that differ from their loaded values.
+
+        Every loaded field counts as dirty for an unsaved instance. A deferred
+        field is dirty once it has been assigned.
+        """
+        loaded_values = getattr(self, "_loaded_values", None)
+        if self._state.adding or loaded_values is None:
+            return {attname for attname in self._tracked_attnames() if attname in self.__dict__}
+        return {
+            attname
+            for attname in self._tracked_attnames()
+            if attname in self.__dict__
+            and (attname not in loaded_values or self.__dict__[attname] != loaded_values[attname])
+        }
+
+    def has_field_changed(self, field_name: str) -> bool:
+        """Return True if the field (by name or attname) is dirty."""
+        return self._meta.get_field(field_name).attname in self.get_dirty_fields()
+
+    def get_update_fields(self, dirty_fields: Set[str]) -> Set[str]:
+        """
+        Columns written when saving `dirty_fields`; adds auto_now timestamps.
+
+        Subclasses extend this for columns derived in pre_save from other
+        fields, which Django only computes for fields listed in update_fields.
+        """
+        auto_now = {
+            field.attname
+            for field in self._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        }
+        return dirty_fields | auto_now
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        explicit = (
+            args
+            or self._state.adding
+            or kwargs.get("force_insert")
+            or kwargs.get("force_update")
+            or kwargs.get("update_fields") is not None
+        )
+        if explicit:
+            super().save(*args, **kwargs)
+            _count("full")
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and not self._state.adding:
+                # Fields left out of update_fields are still unsaved
+                self._snapshot_fields(self._meta.get_field(name).attname for name in update_fields)
+                return
+        else:
+            dirty_fields = self.get_dirty_fields()
+            if not dirty_fields:
+                _count("skipped")
+                return
+            kwargs["update_fields"] = self.get_update_fields(dirty_fields)
+            super().save(*args, **kwargs)
+            _count("partial")
+        self._snapshot_fields()
+
@@ -0,0 +1,99 @@
+"""
+Cached rendering of HTML email templates and their plain-text variants.
+
+Each email template is compiled once per process. The plain-text variant is
+not produced by running strip_tags() over every rendered message: instead a
+second template engine loads the template sources with their HTML tags
+already stripped, so the text template is compiled once and each send only
+substitutes the context variables. Email templates should therefore keep
+template tags out of HTML tag markup (e.g. no comparisons with "<").
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.template import Context, Engine
+from django.template.backends.django import Template as BackendTemplate
+from django.template.loader import get_template
+from django.template.loaders import app_directories, filesystem
+from django.utils.html import strip_tags
+
+
+class PlainTextLoaderMixin:
+    """Template loader mixin that strips HTML tags from template sources."""
+
+    def get_contents(self, origin: Any) -> str:
+        return strip_tags(super().get_contents(origin))
+
+
+class PlainTextFilesystemLoader(PlainTextLoaderMixin, filesystem.Loader):
+    pass
+
+
+class PlainTextAppDirectoriesLoader(PlainTextLoaderMixin, app_directories.Loader):
+    pass
+
+
+@lru_cache(maxsize=None)
+def get_plain_text_engine() -> Engine:
+    """
+    Build the template engine used for plain-text email variants.
+
+    It reads the same template directories as the project's Django engine,
+    with tag-stripping loaders wrapped in the cached loader and autoescaping
+    turned off.
+    """
+    template_settings = settings.TEMPLATES[0]
+    return Engine(
+        dirs=template_settings.get("DIRS", []),
+        autoescape=False,
+        loaders=[
+            (
+                "django.template.loaders.cached.Loader",
+                [
+                    "core_apps.common.email_rendering.PlainTextFilesystemLoader",
+                    "core_apps.common.email_rendering.PlainTextAppDirectoriesLoader",
+                ],
+            )
+        ],
+    )
+
+
+@lru_cache(maxsize=None)
+def get_html_template(template_name: str) -> BackendTemplate:
+    """Return the compiled HTML template, loading it once per process."""
+    return get_template(template_name)
+
+
+@lru_cache(maxsize=None)
+def get_plain_text_template(template_name: str) -> Any:
+    """Return the compiled plain-text variant of an email template."""
+    return get_plain_text_engine().get_template(template_name)
+
+
+def render_email(template_name: str, context: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Render one email.
+
+    Returns:
+        Tuple[str, str]: The HTML body and the plain-text body
+    """
+    return render_emails(template_name, [context])[0]
+
+
+def render_emails(template_name: str, contexts: Iterable[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """
+    Render the same email template for many recipients.
+
+    The templates are looked up once for the whole batch.
+
+    Returns:
+        List[Tuple[str, str]]: (HTML body, plain-text body) per context, in order
+    """
+    html_template = get_html_template(template_name)
+    plain_template = get_plain_text_template(template_name)
+    return [
+        (html_template.render(context), plain_template.render(Context(context, autoescape=False)))
+        for context in contexts
+    ]
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from loguru import logger
+
+from .tasks import send_templated_email, send_templated_email_batch
+
+def queue_templated_email(
+    subject: str,
+    template_name: str,
+    recipient_list: List[str],
+    context: Dict[str, Any],
+    dedup_key: Optional[str] = None,
+    dedup_timeout: timedelta = timedelta(minutes=5),
+) -> bool:
+    """
+    Queue a templated email for delivery by a Celery worker.
+
+    Args:
+        subject: The email subject line
+        template_name: The HTML template to render in the worker
+        recipient_list: Addresses to send the email to
+        context: JSON-serializable template context
+        dedup_key: Optional key identifying this email; a second email with the
+            same key inside dedup_timeout is dropped
+        dedup_timeout: How long the dedup key is held
+
+    Returns:
+        bool: True if the email was queued, False if it was a duplicate or the
+        broker rejected it
+    """
+    cache_key = f"email-dedup:{dedup_key}" if dedup_key else None
+    if cache_key and not cache.add(cache_key, 1, timeout=int(dedup_timeout.total_seconds())):
+        logger.info(f"Skipping duplicate email {dedup_key}")
+        return False
+    try:
+        send_templated_email.delay(str(subject), template_name, recipient_list, context)
+    except Exception as e:
+        if cache_key:
+            cache.delete(cache_key)
+        logger.error(f"Failed to queue {template_name} for {recipient_list}: Error: {str(e)}", exc_info=True)
+        return False
+    return True
+
+def queue_templated_emails(
+    subject: str,
+    template_name: str,
+    messages: Iterable[Tuple[List[str], Dict[str, Any]]],
+    chunk_size: int = 100,
+) -> int:
+    """
+    Queue the same templated email for many recipients.
+
+    Messages are grouped into batches of chunk_size. Each batch is rendered
+    and sent by one worker task over a single SMTP connection, so a retry only
+    repeats its own batch.
+
+    Args:
+        subject: The email subject line
+        template_name: The HTML template to render in the worker
+        messages: (recipient_list, context) pairs, one per email
+        chunk_size: Number of emails per worker task
+
+    Returns:
+        int: The number of emails queued
+    """
+    queued = 0
+    batch = []
+    for recipient_list, context in messages:
+        batch.append([recipient_list, context])
+        if len(batch) == chunk_size:
+            send_templated_email_batch.delay(str(subject), template_name, batch)
+            queued += len(batch)
+            batch = []
+    if batch:
+        send_templated_email_batch.delay(str(subject), template_name, batch)
+        queued += len(batch)
+    return queued
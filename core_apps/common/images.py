@@ -0,0 +1,97 @@
+"""
+Resized image variants ("derivatives") of uploaded photos.
+
+Each variant in settings.IMAGE_VARIANTS is rendered with Pillow to a
+compressed JPEG next to the source file. Rendering runs in a thread pool
+so the variants of several photos are produced in parallel; Pillow releases
+the GIL while decoding, resizing and encoding.
+"""
+
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+DEFAULT_IMAGE_VARIANTS = {
+    "thumb": {"size": (200, 200), "crop": True, "quality": 80},
+    "list": {"size": (480, 480), "crop": False, "quality": 82},
+    "full": {"size": (1600, 1600), "crop": False, "quality": 85},
+}
+
+
+def get_image_variants() -> Dict[str, Dict[str, Any]]:
+    """Return the configured variants: name -> {size, crop, quality}."""
+    return getattr(settings, "IMAGE_VARIANTS", DEFAULT_IMAGE_VARIANTS)
+
+
+def variant_path(source: Path, variant: str) -> Path:
+    """Return where the `variant` of `source` is written."""
+    return source.with_name(f"{source.stem}.{variant}.jpg")
+
+
+def render_variant(source: str, destination: str, size: Tuple[int, int], crop: bool, quality: int) -> str:
+    """
+    Render one variant of an image to a JPEG file.
+
+    Args:
+        source: Path of the original image
+        destination: Path the variant is written to
+        size: Bounding box (width, height)
+        crop: Crop to fill the box exactly instead of fitting inside it
+        quality: JPEG quality
+
+    Returns:
+        str: The destination path
+    """
+    with Image.open(source) as image:
+        image.draft("RGB", size)
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if crop:
+            image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+        image.save(destination, "JPEG", quality=quality, optimize=True, progressive=True)
+    return destination
+
+
+def get_image_executor() -> Executor:
+    """
+    Return the pool variants are rendered in.
+
+    Threads rather than processes: variants are rendered in Celery's prefork
+    pool children, which are daemonic and may not start child processes.
+    """
+    workers = getattr(settings, "IMAGE_WORKERS", None) or os.cpu_count() or 1
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def generate_derivatives(sources: Iterable[Path]) -> Dict[Path, Dict[str, Path]]:
+    """
+    Render every configured variant of every source image in parallel.
+
+    Returns:
+        Dict[Path, Dict[str, Path]]: source -> {variant name: variant path}
+    """
+    variants = get_image_variants()
+    with get_image_executor() as pool:
+        futures = {
+            (source, name): pool.submit(
+                render_variant,
+                str(source),
+                str(variant_path(source, name)),
+                tuple(spec["size"]),
+                spec.get("crop", False),
+                spec.get("quality", 85),
+            )
+            for source in sources
+            for name, spec in variants.items()
+        }
+        derivatives: Dict[Path, Dict[str, Path]] = {}
+        for (source, name), future in futures.items():
+            derivatives.setdefault(source, {})[name] = Path(future.result())
+    return derivatives
@@ -0,0 +1,157 @@
+"""
+Per-request performance metrics.
+
+PerformanceMiddleware creates a RequestMetrics for each request and makes it
+the current one for the duration of the request. Code further down the stack
+reports into it without having the request at hand: the user cache records
+its hits and misses, and serializers using TimedSerializerMixin record the
+time spent building representations.
+
+Slow requests are sampled into a ring buffer kept in a Redis list, so the
+admin endpoint sees the most recent slow requests of every worker.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+from django.conf import settings
+from django_redis import get_redis_connection
+from loguru import logger
+from redis.exceptions import RedisError
+
+from .query_count import QueryCounter
+
+_current_metrics: ContextVar[Optional["RequestMetrics"]] = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Timings and counters collected while one request is handled."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.queries = QueryCounter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_time = 0.0
+        self._serializer_depth = 0
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    @contextmanager
+    def serializing(self) -> Iterator[None]:
+        """Time a serializer call; nested serializers are counted once."""
+        self._serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._serializer_depth -= 1
+            if self._serializer_depth == 0:
+                self.serializer_time += time.perf_counter() - start
+
+    def server_timing(self) -> str:
+        """Format the metrics as a Server-Timing header value (durations in ms)."""
+        return ", ".join([
+            f"total;dur={self.duration * 1000:.1f}",
+            f'db;dur={self.queries.duration * 1000:.1f};desc="{self.queries.count} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f"serializer;dur={self.serializer_time * 1000:.1f}",
+        ])
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "duration_ms": round(self.duration * 1000, 1),
+            "queries": self.queries.count,
+            "db_ms": round(self.queries.duration * 1000, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "serializer_ms": round(self.serializer_time * 1000, 1),
+        }
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """Return the metrics of the request being handled, if any."""
+    return _current_metrics.get()
+
+
+def activate_metrics(metrics: Optional[RequestMetrics]):
+    """Make `metrics` the current request's metrics; returns a reset token."""
+    return _current_metrics.set(metrics)
+
+
+def deactivate_metrics(token) -> None:
+    _current_metrics.reset(token)
+
+
+def record_cache_access(hit: bool) -> None:
+    """Count a cache hit or miss against the current request."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin that adds to_representation() time to the request metrics.
+    """
+
+    def to_representation(self, instance: Any) -> Any:
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return super().to_representation(instance)
+        with metrics.serializing():
+            return super().to_representation(instance)
+
+
+class SlowRequestLog:
+    """
+    Ring buffer of recent slow requests, stored in a capped Redis list.
+    """
+    key = "slow-requests"
+
+    @property
+    def redis(self):
+        return get_redis_connection(getattr(settings, "SLOW_REQUEST_CACHE_ALIAS", "default"))
+
+    @property
+    def size(self) -> int:
+        return getattr(settings, "SLOW_REQUEST_BUFFER_SIZE", 100)
+
+    def should_record(self, duration: float) -> bool:
+        threshold = getattr(settings, "SLOW_REQUEST_THRESHOLD", 0.5)
+        sample_rate = getattr(settings, "SLOW_REQUEST_SAMPLE_RATE", 1.0)
+        return duration >= threshold and random.random() < sample_rate
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        try:
+            pipe = self.redis.pipeline()
+            pipe.lpush(self.key, orjson.dumps(entry))
+            pipe.ltrim(self.key, 0, self.size - 1)
+            pipe.execute()
+        except RedisError as e:
+            logger.error(f"Could not record slow request {entry.get('path')}: {str(e)}")
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the most recent slow requests, newest first."""
+        end = (limit or self.size) - 1
+        return [orjson.loads(entry) for entry in self.redis.lrange(self.key, 0, end)]
+
+    def clear(self) -> None:
+        self.redis.delete(self.key)
+
+
+slow_request_log = SlowRequestLog()
@@ -0,0 +1,198 @@
+"""
+Pluggable storage for uploaded media (profile photos and their variants).
+
+Files are content-addressed: the key of a stored file is derived from the
+SHA-256 of its bytes, so storing the same photo twice finds the existing
+copy instead of writing or uploading it again. Models keep the key in their
+photo columns and the URL returned by save() in the matching *_url columns.
+
+The backend in use is selected by the MEDIA_STORAGE_BACKEND setting:
+
+- LocalMediaStorage writes to a directory served under MEDIA_URL; it needs
+  no network and is what development and benchmarks run against.
+- CloudinaryMediaStorage uploads to Cloudinary, remembering which digests
+  it has already uploaded in the cache.
+"""
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urljoin
+
+import cloudinary
+import cloudinary.uploader
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+@dataclass(frozen=True)
+class StoredMedia:
+    """A stored file: its storage key, public URL and whether it was new."""
+    key: str
+    url: str
+    created: bool
+
+
+def content_digest(data: Any) -> str:
+    """Return the SHA-256 hex digest of a bytes-like object (bytes, mmap, ...)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BaseMediaStorage:
+    """
+    Interface shared by all media storage backends.
+
+    Subclasses implement make_key(), exists(), _write() and url(); save()
+    provides the content addressing and deduplication on top of them.
+    """
+
+    def make_key(self, digest: str, suffix: str) -> str:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def _write(self, key: str, data: Any) -> str:
+        """Store `data` under `key` and return its URL."""
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def save(self, data: Any, suffix: str = "") -> StoredMedia:
+        """
+        Store a file's bytes, unless identical content is already stored.
+
+        Args:
+            data: The file contents, as any bytes-like object
+            suffix: File extension, e.g. ".jpg"
+
+        Returns:
+            StoredMedia: The key and URL of the stored (or existing) file
+        """
+        key = self.make_key(content_digest(data), suffix.lower())
+        if self.exists(key):
+            return StoredMedia(key, self.url(key), created=False)
+        return StoredMedia(key, self._write(key, data), created=True)
+
+
+class LocalMediaStorage(BaseMediaStorage):
+    """
+    Stores files on the local filesystem under `root`, fanned out into
+    two-level directories by digest prefix, and serves them from `base_url`.
+    """
+
+    def __init__(self, root: Optional[str] = None, base_url: Optional[str] = None) -> None:
+        self.root = Path(root or settings.MEDIA_ROOT)
+        self.base_url = base_url or settings.MEDIA_URL
+
+    def make_key(self, digest: str, suffix: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{suffix}"
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def _write(self, key: str, data: Any) -> str:
+        destination = self.path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary name first, so a file only ever exists
+        # under its key once it is complete
+        fd, partial_path = tempfile.mkstemp(dir=destination.parent, prefix=".partial-")
+        try:
+            with os.fdopen(fd, "wb") as stored:
+                stored.write(data)
+            os.replace(partial_path, destination)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+            raise
+        return self.url(key)
+
+    def url(self, key: str) -> str:
+        return urljoin(self.base_url, key)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class CloudinaryMediaStorage(BaseMediaStorage):
+    """
+    Stores files in Cloudinary with the digest as public id.
+
+    Uploaded digests are recorded in the cache so repeated content skips the
+    API entirely; if the record is gone, the upload is made with
+    overwrite=False and Cloudinary keeps the existing asset.
+    """
+    cache_prefix = "media-digest"
+
+    def __init__(self, folder: str = "school_media", cache_alias: str = "default") -> None:
+        self.folder = folder
+        self.cache = caches[cache_alias]
+
+    def make_key(self, digest: str, suffix: str) -> str:
+        # Cloudinary public ids carry no extension
+        return f"{self.folder}/{digest}"
+
+    def exists(self, key: str) -> bool:
+        return self.cache.get(f"{self.cache_prefix}:{key}") is not None
+
+    def _write(self, key: str, data: Any) -> str:
+        # The SDK builds the whole multipart body in memory, so `data` is
+        # copied here whatever its type
+        response = cloudinary.uploader.upload(
+            (key.rsplit("/", 1)[-1], data), public_id=key, overwrite=False, unique_filename=False
+        )
+        self.cache.set(f"{self.cache_prefix}:{key}", response["secure_url"], timeout=None)
+        return response["secure_url"]
+
+    def url(self, key: str) -> str:
+        url = self.cache.get(f"{self.cache_prefix}:{key}")
+        return url or cloudinary.CloudinaryImage(key).build_url(secure=True)
+
+    def delete(self, key: str) -> None:
+        cloudinary.uploader.destroy(key)
+        self.cache.delete(f"{self.cache_prefix}:{key}")
+
+
+def media_url(value: Any) -> Optional[str]:
+    """
+    Return the URL of the file a photo column refers to, or None if empty.
+
+    The column holds a storage key, which CloudinaryField loads as a
+    CloudinaryResource; its `.url` would always point at Cloudinary, so the
+    key is rebuilt from it and resolved by the configured storage.
+    """
+    if not value:
+        return None
+    if isinstance(value, cloudinary.CloudinaryResource):
+        if not value.public_id:
+            return None
+        value = f"{value.public_id}.{value.format}" if value.format else value.public_id
+    return get_media_storage().url(str(value))
+
+
+@lru_cache(maxsize=None)
+def get_media_storage() -> BaseMediaStorage:
+    """
+    Return the configured media storage instance.
+
+    The class is read from settings.MEDIA_STORAGE_BACKEND and built once per
+    process with settings.MEDIA_STORAGE_OPTIONS as keyword arguments.
+    """
+    backend_path = getattr(settings, "MEDIA_STORAGE_BACKEND", "core_apps.common.media_storage.CloudinaryMediaStorage")
+    return import_string(backend_path)(**getattr(settings, "MEDIA_STORAGE_OPTIONS", {}))
+
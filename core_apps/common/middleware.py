@@ -0,0 +1,117 @@
+"""
+Middleware that measures every request and reports the results.
+
+Each request gets one log line with wall time, database time and query
+count, user cache hits and misses, and serializer time. Requests slower than
+settings.SLOW_REQUEST_THRESHOLD seconds are sampled into the slow request log.
+
+The same fields are sent in a Server-Timing header only when they are not
+leaked to clients: with DEBUG on, to staff users the view has already
+authenticated, or everywhere when settings.SERVER_TIMING_HEADER is set.
+"""
+
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpRequest, HttpResponseBase
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
+from loguru import logger
+
+from .instrumentation import RequestMetrics, activate_metrics, deactivate_metrics, slow_request_log
+from .query_count import counting_queries
+
+
+def loaded_user(request: HttpRequest) -> Optional[Any]:
+    """
+    Return the request user only if it has already been loaded.
+
+    request.user is lazy: reading any attribute of it runs the session and
+    user lookups. Views that authenticate (DRF replaces it with the real
+    user) have loaded it already; for the rest it stays unknown rather than
+    costing the request extra queries just to be measured.
+
+    Args:
+        request: The request being measured
+
+    Returns:
+        The user, or None if there is none or it was never evaluated
+    """
+    user = getattr(request, "user", None)
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+class PerformanceMiddleware:
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponseBase]) -> None:
+        """
+        Initialize the middleware with the get_response callable
+        Args:
+            get_response: The next middleware or view in the chain
+        """
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        """
+        Time the request and attach the Server-Timing header if it may be sent.
+
+        For streaming responses the header covers the work done before the
+        body is streamed; the log line and the slow request sample are written
+        once the body has been consumed, so they include the streamed part.
+        """
+        metrics = RequestMetrics()
+        token = activate_metrics(metrics)
+        try:
+            with connection.execute_wrapper(metrics.queries):
+                response = self.get_response(request)
+        finally:
+            deactivate_metrics(token)
+
+        if self.send_server_timing(request):
+            response["Server-Timing"] = metrics.server_timing()
+        if response.streaming:
+            response.streaming_content = self._measure_streaming(request, response, response.streaming_content, metrics)
+        else:
+            self.report(request, response, metrics)
+        return response
+
+    def _measure_streaming(self, request: HttpRequest, response: HttpResponseBase, content: Iterable[bytes], metrics: RequestMetrics) -> Iterator[bytes]:
+        # One query counter stays installed for the whole body; the metrics
+        # are activated around each chunk rather than across the yields,
+        # since the server may resume the iterator in another context.
+        content = iter(content)
+        with counting_queries(metrics.queries):
+            while True:
+                token = activate_metrics(metrics)
+                try:
+                    chunk = next(content, None)
+                finally:
+                    deactivate_metrics(token)
+                if chunk is None:
+                    break
+                yield chunk
+        self.report(request, response, metrics)
+
+    def send_server_timing(self, request: HttpRequest) -> bool:
+        if settings.DEBUG or getattr(settings, "SERVER_TIMING_HEADER", False):
+            return True
+        user = loaded_user(request)
+        return bool(user is not None and user.is_staff)
+
+    def report(self, request: HttpRequest, response: HttpResponseBase, metrics: RequestMetrics) -> None:
+        metrics.finish()
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **metrics.as_dict(),
+        }
+        logger.info(" ".join(f"{key}={value}" for key, value in fields.items()))
+
+        if slow_request_log.should_record(metrics.duration):
+            user = loaded_user(request)
+            fields["user_id"] = str(user.pk) if user is not None and user.is_authenticated else None
+            fields["timestamp"] = timezone.now().isoformat()
+            slow_request_log.record(fields)
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:07
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentViewDaily",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("object_id", models.UUIDField(verbose_name="Object ID")),
+                ("day", models.DateField(verbose_name="Day")),
+                (
+                    "viewers",
+                    models.PositiveIntegerField(default=0, verbose_name="Viewers"),
+                ),
+                (
+                    "authenticated_viewers",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Authenticated Viewers"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Content Views",
+                "verbose_name_plural": "Daily Content Views",
+                "ordering": ["-day"],
+            },
+        ),
+        migrations.AddField(
+            model_name="contentview",
+            name="counted_on",
+            field=models.DateField(
+                blank=True, editable=False, null=True, verbose_name="Counted On"
+            ),
+        ),
+        migrations.AddField(
+            model_name="contentviewdaily",
+            name="content_type",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                to="contenttypes.contenttype",
+                verbose_name="Content Type",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contentviewdaily",
+            index=models.Index(
+                fields=["day", "content_type"], name="common_cont_day_18782c_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="contentviewdaily",
+            unique_together={("content_type", "object_id", "day")},
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # index this way does not block writes to the (large) ContentView table
+    atomic = False
+
+    dependencies = [
+        ("common", "0002_content_view_rollups"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="contentview",
+            index=models.Index(
+                fields=["last_viewed"], name="common_cont_last_vi_3b6e37_idx"
+            ),
+        ),
+    ]
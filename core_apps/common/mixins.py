@@ -0,0 +1,106 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponseBase, StreamingHttpResponse
+from loguru import logger
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .query_count import QueryCounter, counting_queries
+from .renderers import GenericJSONRenderer
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view issues more queries than its budget."""
+
+class QueryBudgetMixin:
+    """
+    Enforces a fixed number of database queries per request on a view.
+
+    Queries are counted for the whole request, including the serialization
+    done while a streaming response is written. Exceeding `query_budget` logs
+    an error, and raises QueryBudgetExceeded when settings.QUERY_BUDGET_STRICT
+    is on, which makes N+1 regressions fail loudly in development and CI. In
+    strict mode a streaming body is rendered before the response is returned,
+    so the error is raised before anything is sent.
+
+    `query_budget` is either one budget for every method or a dict of
+    budgets by HTTP method, e.g. {"GET": 3}; methods missing from the dict
+    are not counted.
+    """
+    query_budget: Optional[Union[int, Dict[str, int]]] = None
+
+    def get_query_budget(self, request: Any) -> Optional[int]:
+        if isinstance(self.query_budget, dict):
+            return self.query_budget.get(request.method)
+        return self.query_budget
+
+    def dispatch(self, request: Any, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        budget = self.get_query_budget(request)
+        if budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+
+        if response.streaming and getattr(settings, "QUERY_BUDGET_STRICT", False):
+            with connection.execute_wrapper(counter):
+                content = list(response.streaming_content)
+            response.streaming_content = content
+        elif response.streaming:
+            response.streaming_content = self._count_streaming(response.streaming_content, counter, budget)
+            return response
+        self.check_query_budget(counter, budget)
+        return response
+
+    def _count_streaming(self, content: Iterable[bytes], counter: QueryCounter, budget: int) -> Iterator[bytes]:
+        with counting_queries(counter):
+            yield from content
+        self.check_query_budget(counter, budget)
+
+    def check_query_budget(self, counter: QueryCounter, budget: int) -> None:
+        if counter.count <= budget:
+            return
+        message = (
+            f"{type(self).__name__} issued {counter.count} queries, "
+            f"over its budget of {budget}"
+        )
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.error(message)
+
+class StreamingListMixin:
+    """
+    List mixin that streams paginated pages through GenericJSONRenderer.
+
+    The page's objects are serialized `stream_chunk_size` at a time while the
+    response is being written, instead of building the whole serialized page
+    and its encoded body in memory first. Falls back to the regular list()
+    when pagination is off or another renderer was negotiated.
+    """
+    stream_chunk_size = 25
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        renderer = getattr(request, "accepted_renderer", None)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None or not isinstance(renderer, GenericJSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        paginator = self.paginator
+        page_fields = {
+            "count": paginator.page.paginator.count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        }
+        chunks = (
+            self.get_serializer(page[start:start + self.stream_chunk_size], many=True).data
+            for start in range(0, len(page), self.stream_chunk_size)
+        )
+        object_label = getattr(self, "object_label", renderer.object_label)
+        return StreamingHttpResponse(
+            renderer.stream(status.HTTP_200_OK, object_label, page_fields, chunks),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
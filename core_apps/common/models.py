@@ -7,12 +7,15 @@ from django.db import IntegrityError, models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .dirty_fields import DirtyFieldsMixin
+
 User = get_user_model()
 
-class TimestampedModel(models.Model):
+class TimestampedModel(DirtyFieldsMixin, models.Model):
     """
     An abstract base model that provides UUID primary key and timestamp fields.
     Used as a base class for other models to inherit common fields.
+    Saves of loaded rows only write changed columns (see dirty_fields.py).
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -33,11 +36,14 @@ class ContentView(TimestampedModel):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, verbose_name=_("User"), null=True, blank=True,  related_name="content_views")
     viewer_ip = models.GenericIPAddressField(verbose_name=_("Viewer IP"), null=True, blank=True)
     last_viewed = models.DateTimeField()
+    # Day this viewer was last counted in ContentViewDaily (see rollups.py)
+    counted_on = models.DateField(verbose_name=_("Counted On"), null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = _("Content View")
         verbose_name_plural = _("Content Views")
         unique_together = ["content_type", "object_id", "user", "viewer_ip"]
+        indexes = [models.Index(fields=["last_viewed"])]
 
     def __str__(self)->str:
         return f"{self.content_type} viewed by {self.user.get_full_name if self.user else 'Anonymous'} from IP {self.viewer_ip}"
@@ -45,31 +51,50 @@ class ContentView(TimestampedModel):
     @classmethod
     def record_view(cls, content_object: Any, user: Optional[User], viewer_ip: Optional[str] = None) -> None:
         """
-        Records a view for any content object. If a view already exists for the given
-        content object, user, and IP combination, it updates the last_viewed timestamp.
+        Records a view for any content object directly in the database. If a view
+        already exists for the given content object, user, and IP combination, it
+        updates the last_viewed timestamp.
+
+        Request handlers should use view_buffer.buffer_view() instead, which
+        batches these writes; this is its fallback when Redis is unavailable.
 
         Args:
             content_object: The object being viewed (can be any model instance)
             user: The user viewing the content (optional)
             viewer_ip: IP address of the viewer (optional)
-
-        Note:
-            Uses get_or_create to handle race conditions and IntegrityError for
-            concurrent requests to the same content.
         """
         content_type = ContentType.objects.get_for_model(content_object)
         try:
-            view, created = cls.objects.get_or_create(
+            cls.objects.update_or_create(
                 content_type=content_type,
                 object_id=content_object.id,
-                defaults={
-                    "user":user,
-                    "viewer_ip":viewer_ip,
-                    "last_viewed": timezone.now()
-                    },
+                user=user,
+                viewer_ip=viewer_ip,
+                defaults={"last_viewed": timezone.now()},
             )
-            if not created:
-                view.last_viewed = timezone.now()
-                view.save()
         except IntegrityError:
             pass
+
+
+class ContentViewDaily(TimestampedModel):
+    """
+    Daily per-object rollup of ContentView: how many distinct viewers viewed
+    an object on a day. Built incrementally by the rollup_content_views task,
+    and kept after the raw views are purged.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, verbose_name=_("Content Type"))
+    object_id = models.UUIDField(verbose_name=_("Object ID"))
+    content_object = GenericForeignKey("content_type", "object_id")
+    day = models.DateField(verbose_name=_("Day"))
+    viewers = models.PositiveIntegerField(verbose_name=_("Viewers"), default=0)
+    authenticated_viewers = models.PositiveIntegerField(verbose_name=_("Authenticated Viewers"), default=0)
+
+    class Meta:
+        verbose_name = _("Daily Content Views")
+        verbose_name_plural = _("Daily Content Views")
+        unique_together = ["content_type", "object_id", "day"]
+        indexes = [models.Index(fields=["day", "content_type"])]
+        ordering = ["-day"]
+
+    def __str__(self) -> str:
+        return f"{self.content_type} {self.object_id} on {self.day}: {self.viewers} viewers"
@@ -1,35 +1,111 @@
+from enum import IntFlag
+from typing import Any, Callable
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
 from rest_framework import permissions
+from rest_framework.filters import BaseFilterBackend
 from rest_framework.request import Request
 from rest_framework.views import View
 
-class IsAdministrator(permissions.BasePermission):
-    def has_permission(self, request: Request, view: View) -> bool:
-        is_authenticated = request.user.is_authenticated
-        has_role_attr = hasattr(request.user, "role")
-        return (
-            is_authenticated and has_role_attr and request.user.role == "administrator"
-        )
+User = get_user_model()
 
-class IsTeacher(permissions.BasePermission):
-    def has_permission(self, request: Request, view: View) -> bool:
-        is_authenticated = request.user.is_authenticated
-        has_role_attr = hasattr(request.user, "role")
-        return (
-            is_authenticated and has_role_attr and request.user.role == "teacher"
-        )
+class Role(IntFlag):
+    """Bit flags for User.RoleChoices, so role checks are single mask tests."""
+    NONE = 0
+    ADMINISTRATOR = 1
+    TEACHER = 2
+    PARENT = 4
+    STUDENT = 8
 
-class IsParent(permissions.BasePermission):
-    def has_permission(self, request: Request, view: View) -> bool:
-        is_authenticated = request.user.is_authenticated
-        has_role_attr = hasattr(request.user, "role")
-        return (
-            is_authenticated and has_role_attr and request.user.role == "parent"
-        )
+ROLE_BITS = {
+    User.RoleChoices.ADMINISTRATOR: Role.ADMINISTRATOR,
+    User.RoleChoices.TEACHER: Role.TEACHER,
+    User.RoleChoices.PARENT: Role.PARENT,
+    User.RoleChoices.STUDENT: Role.STUDENT,
+}
+
+def get_role_mask(request: Request) -> Role:
+    """
+    Return the role bitmask of the requesting user.
+
+    The mask is computed once and stored on the request, so every permission
+    class evaluated for the request reuses it. Anonymous users get Role.NONE.
+    """
+    mask = getattr(request, "_role_mask", None)
+    if mask is None:
+        user = request.user
+        if user is not None and user.is_authenticated:
+            mask = ROLE_BITS.get(getattr(user, "role", None), Role.NONE)
+        else:
+            mask = Role.NONE
+        request._role_mask = mask
+    return mask
+
+class RolePermission(permissions.BasePermission):
+    """
+    Grants access when the user holds any of the roles in `roles`.
+
+    Subclasses set `roles` to a Role mask, e.g. Role.TEACHER | Role.ADMINISTRATOR.
+    Combine classes with DRF's operators: `IsTeacher | IsAdministrator`,
+    `IsTeacher & IsProfileOwner`, `~IsStudent`.
+    """
+    roles = Role.NONE
 
-class IsStudent(permissions.BasePermission):
     def has_permission(self, request: Request, view: View) -> bool:
-        is_authenticated = request.user.is_authenticated
-        has_role_attr = hasattr(request.user, "role")
-        return (
-            is_authenticated and has_role_attr and request.user.role == "student"
-        )
\ No newline at end of file
+        return bool(get_role_mask(request) & self.roles)
+
+def role_permission(roles: Role) -> type:
+    """Build a RolePermission class for a role mask."""
+    return type(f"HasRole_{int(roles)}", (RolePermission,), {"roles": roles})
+
+class IsAdministrator(RolePermission):
+    roles = Role.ADMINISTRATOR
+
+class IsTeacher(RolePermission):
+    roles = Role.TEACHER
+
+class IsParent(RolePermission):
+    roles = Role.PARENT
+
+class IsStudent(RolePermission):
+    roles = Role.STUDENT
+
+class ObjectRulePermission(permissions.BasePermission):
+    """
+    Object-level permission described by a queryset filter.
+
+    `rule(request)` returns a Q object selecting the objects the request may
+    access. The same rule checks a single object in has_object_permission and
+    narrows a whole queryset at once in filter_queryset, which is what
+    PermissionQuerysetFilter uses on list endpoints.
+    """
+    rule: Callable[[Request], Q]
+
+    def has_object_permission(self, request: Request, view: View, obj: Any) -> bool:
+        return type(obj)._default_manager.filter(pk=obj.pk).filter(self.rule(request)).exists()
+
+    def filter_queryset(self, request: Request, queryset: QuerySet) -> QuerySet:
+        return queryset.filter(self.rule(request))
+
+def object_permission(rule: Callable[[Request], Q]) -> type:
+    """
+    Decorator turning a `rule(request) -> Q` function into a permission class.
+
+    Example:
+        @object_permission
+        def IsProfileOwner(request):
+            return Q(user=request.user)
+    """
+    return type(rule.__name__, (ObjectRulePermission,), {"rule": staticmethod(rule), "__doc__": rule.__doc__})
+
+class PermissionQuerysetFilter(BaseFilterBackend):
+    """
+    Filter backend that applies every object-rule permission on the view to
+    the list queryset, evaluating object-level access in one query.
+    """
+    def filter_queryset(self, request: Request, queryset: QuerySet, view: View) -> QuerySet:
+        for permission in view.get_permissions():
+            if isinstance(permission, ObjectRulePermission):
+                queryset = permission.filter_queryset(request, queryset)
+        return queryset
@@ -0,0 +1,50 @@
+"""
+Counting of the database queries issued while a block of code runs.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class QueryCounter:
+    """
+    Database execute wrapper that counts queries and their total duration.
+
+    Install it with `connection.execute_wrapper(counter)`, or with
+    counting_queries() around code that yields; the same counter can be
+    installed several times to keep counting across separate blocks, such as
+    a view and the streaming of its response.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+@contextmanager
+def counting_queries(counter: QueryCounter, using: str = DEFAULT_DB_ALIAS) -> Iterator[QueryCounter]:
+    """
+    Install `counter` on a connection until the block exits.
+
+    connection.execute_wrapper() removes the most recently installed wrapper
+    on exit, so it is only safe around code that does not yield. This removes
+    `counter` itself, and can be held across the chunks of a streaming
+    response while other code installs and removes its own wrappers.
+    """
+    connection = connections[using]
+    connection.execute_wrappers.append(counter)
+    try:
+        yield counter
+    finally:
+        connection.execute_wrappers.remove(counter)
@@ -1,33 +1,80 @@
-import json
-from typing import Any, Optional, Union
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
 
+import orjson
+from django.utils.functional import Promise
 from django.utils.translation import gettext_lazy as _
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback_encoder = JSONEncoder()
+
+def encode_default(obj: Any) -> Any:
+    """
+    Encode the types orjson does not handle natively.
+
+    UUID, datetime, date and time are serialized by orjson itself; Decimal
+    and lazy translation strings become strings, and anything else goes
+    through DRF's JSONEncoder.
+    """
+    if isinstance(obj, (Decimal, Promise)):
+        return str(obj)
+    return _fallback_encoder.default(obj)
+
+def dumps(data: Any) -> bytes:
+    return orjson.dumps(data, default=encode_default)
 
 class GenericJSONRenderer(JSONRenderer):
+    """
+    Wraps response data in a `{"status_code": ..., <object_label>: ...}` envelope.
+
+    The envelope is written around the orjson-encoded payload directly, so the
+    data is encoded once without building an intermediate dict. Error
+    responses (`{"errors": ...}`) are rendered without the envelope.
+    """
     charset = 'utf-8'
     object_label = 'object'
 
-    def render(self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[dict] = None) -> Union[bytes, str]:
-        if renderer_context is not None:
-            renderer_context = {}
-
+    def get_object_label(self, renderer_context: Dict[str, Any]) -> str:
         view = renderer_context.get("view")
+        return getattr(view, "object_label", self.object_label)
 
-        if hasattr(view, "get_object"):
-            object_label = view.object_label
-        else:
-            object_label = self.object_label
+    def envelope_prefix(self, status_code: int, object_label: str) -> bytes:
+        return b'{"status_code":%d,%s:' % (status_code, dumps(object_label))
 
-        response = renderer_context.get("response")
+    def render(self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[dict] = None) -> Union[bytes, str]:
+        if data is None:
+            return b""
 
-        if response is not None:
+        renderer_context = renderer_context or {}
+
+        response = renderer_context.get("response")
+        if response is None:
             raise ValueError(_("Response not found in renderer context."))
 
-        status_code = response.status_code
+        if isinstance(data, dict) and data.get("errors") is not None:
+            return dumps(data)
+
+        object_label = self.get_object_label(renderer_context)
+        return self.envelope_prefix(response.status_code, object_label) + dumps(data) + b"}"
 
-        errors = data.get("errors", None)
-        if errors is not None:
-            return super(GenericJSONRenderer, self).render(data)
+    def stream(self, status_code: int, object_label: str, page: Dict[str, Any], result_chunks: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+        """
+        Render a paginated list in the same envelope, one chunk at a time.
 
-        return json.dumps({"status_code": status_code, object_label: data}).encode(self.charset)
\ No newline at end of file
+        Args:
+            status_code: The HTTP status code written into the envelope
+            object_label: The envelope key for the page
+            page: Pagination fields (count, next, previous) placed before results
+            result_chunks: Serialized results, produced lazily in chunks
+        """
+        yield self.envelope_prefix(status_code, object_label)
+        yield dumps(page)[:-1] + (b',"results":[' if page else b'"results":[')
+        first = True
+        for chunk in result_chunks:
+            encoded = dumps(list(chunk))[1:-1]
+            if not encoded:
+                continue
+            yield encoded if first else b"," + encoded
+            first = False
+        yield b"]}}"
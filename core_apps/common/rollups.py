@@ -0,0 +1,155 @@
+"""
+Daily rollups and retention of ContentView.
+
+ContentView holds one row per (object, viewer), whose last_viewed moves
+forward with every view. rollup_content_views() turns it into
+ContentViewDaily, the number of distinct viewers per object and day:
+
+- Only rows viewed within CONTENT_VIEW_ROLLUP_LOOKBACK are looked at, a
+  range scan on the last_viewed index.
+- A row counts once per day. counted_on records the day it was last
+  counted, so a viewer seen again on the same day is not counted twice
+  and a viewer who returns on a later day is counted again.
+- Rows are locked while they are counted, and rows the view buffer flush
+  is writing are skipped until the next run.
+- Counts are added to ContentViewDaily with INSERT ... ON CONFLICT DO
+  UPDATE, so overlapping runs never race to create the same row.
+
+A viewer who views an object again on the next day before the rollup
+runs is counted on the later day only, so the rollup should run much more
+often than daily. Rows older than the lookback are never counted, so it
+must also cover the longest time the rollup may be down.
+
+purge_content_views() deletes raw rows whose last view is in a month that
+is older than the retention period. ContentViewDaily is kept, so history
+stays available from the rollups.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ContentView, ContentViewDaily
+
+RollupKey = Tuple[int, Any, date]
+
+
+def pending_views(now: datetime):
+    """ContentView rows viewed on a day they have not been counted for."""
+    lookback = getattr(settings, "CONTENT_VIEW_ROLLUP_LOOKBACK", timedelta(days=2))
+    return (
+        ContentView.objects.filter(last_viewed__gte=now - lookback, last_viewed__lte=now)
+        .annotate(view_day=TruncDate("last_viewed"))
+        .filter(Q(counted_on__isnull=True) | Q(counted_on__lt=F("view_day")))
+    )
+
+
+def _add_to_rollups(counts: Dict[RollupKey, Tuple[int, int]]) -> None:
+    """
+    Add (viewers, authenticated viewers) to the ContentViewDaily rows of `counts`.
+
+    One INSERT ... ON CONFLICT DO UPDATE adds to existing rows and creates
+    missing ones, so overlapping runs that reach the same new row both
+    count into it instead of one failing on the unique constraint.
+    """
+    if not counts:
+        return
+    now = timezone.now()
+    names = ["id", "created_at", "updated_at", "content_type", "object_id", "day", "viewers", "authenticated_viewers"]
+    fields = [ContentViewDaily._meta.get_field(name) for name in names]
+    params = []
+    # Rows are written in key order so concurrent runs lock them in the same order
+    for (content_type_id, object_id, day), (viewers, authenticated_viewers) in sorted(counts.items()):
+        values = [uuid.uuid4(), now, now, content_type_id, object_id, day, viewers, authenticated_viewers]
+        params += [field.get_db_prep_save(value, connection) for field, value in zip(fields, values)]
+
+    quote = connection.ops.quote_name
+    table = quote(ContentViewDaily._meta.db_table)
+    columns = ", ".join(quote(field.column) for field in fields)
+    row = f"({', '.join(['%s'] * len(fields))})"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) VALUES {', '.join([row] * len(counts))} "
+            f"ON CONFLICT ({quote('content_type_id')}, {quote('object_id')}, {quote('day')}) DO UPDATE SET "
+            f"{quote('viewers')} = {table}.{quote('viewers')} + EXCLUDED.{quote('viewers')}, "
+            f"{quote('authenticated_viewers')} = {table}.{quote('authenticated_viewers')} "
+            f"+ EXCLUDED.{quote('authenticated_viewers')}, "
+            f"{quote('updated_at')} = EXCLUDED.{quote('updated_at')}",
+            params,
+        )
+
+
+def rollup_content_views(now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """
+    Count pending ContentView rows into ContentViewDaily.
+
+    Each batch is counted and marked in one transaction, so a failed run
+    leaves its rows pending for the next one.
+
+    Returns:
+        int: The number of rows counted
+    """
+    now = now or timezone.now()
+    counted = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                pending_views(now)
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                return counted
+
+            rows = (
+                ContentView.objects.filter(pk__in=batch)
+                .annotate(view_day=TruncDate("last_viewed"))
+                .values_list("content_type_id", "object_id", "view_day")
+                .annotate(viewers=Count("pk"), authenticated_viewers=Count("user"))
+                .order_by()
+            )
+            counts = {
+                (content_type_id, object_id, day): (viewers, authenticated_viewers)
+                for content_type_id, object_id, day, viewers, authenticated_viewers in rows
+            }
+
+            _add_to_rollups(counts)
+            ContentView.objects.filter(pk__in=batch).update(counted_on=TruncDate("last_viewed"))
+        counted += len(batch)
+
+
+def retention_cutoff(now: Optional[datetime] = None) -> datetime:
+    """
+    Start of the oldest month whose raw views are kept.
+
+    With CONTENT_VIEW_RETENTION_MONTHS = 6, on any day in July everything
+    last viewed before January 1st is purged.
+    """
+    now = timezone.localtime(now or timezone.now())
+    months = now.year * 12 + now.month - 1 - getattr(settings, "CONTENT_VIEW_RETENTION_MONTHS", 6)
+    return now.replace(year=months // 12, month=months % 12 + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def purge_content_views(now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """
+    Delete ContentView rows last viewed before the retention cutoff, in
+    batches so no long-running DELETE holds locks on the table.
+
+    Returns:
+        int: The number of rows deleted
+    """
+    cutoff = retention_cutoff(now)
+    purged = 0
+    while True:
+        batch = list(
+            ContentView.objects.filter(last_viewed__lt=cutoff).values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return purged
+        purged += ContentView.objects.filter(pk__in=batch).delete()[0]
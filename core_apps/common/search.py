@@ -0,0 +1,92 @@
+"""
+Ranked, typo-tolerant search over users and the profiles attached to them.
+
+Names are matched two ways, both served by GIN indexes on the users table:
+
+- Full-text prefix matching against User.search_vector, a generated
+  tsvector column over first, middle and last name ("simple" config, so
+  names are not stemmed).
+- Trigram word similarity on first_name and last_name (pg_trgm), which
+  finds names with a typo or two.
+
+Every word of the search must match one way or the other. Results are
+ordered by full-text rank plus trigram similarity to the full name. Words
+made of digits are prefix lookups on id_no, served by an index on its text
+form.
+
+Outside PostgreSQL, UserSearchFilter falls back to DRF's SearchFilter.
+"""
+
+import re
+from typing import Any, List
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Q, QuerySet, TextField, Value
+from django.db.models.functions import Cast, Concat
+from rest_framework import filters
+from rest_framework.request import Request
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def search_words(terms: List[str]) -> List[str]:
+    """Split search terms into plain words, dropping tsquery operators and punctuation."""
+    return [word.lower() for term in terms for word in WORD_RE.findall(term)]
+
+
+def search_users(queryset: QuerySet, terms: List[str], user_field: str = "") -> QuerySet:
+    """
+    Filter and rank `queryset` by a user search.
+
+    Args:
+        queryset: Users, or any model related to a user
+        terms: Search words as typed, e.g. ["jon", "smi"] or ["20240"]
+        user_field: Path from the queryset's model to the user ("user" for
+            profiles), or "" when searching users themselves
+
+    Returns:
+        QuerySet: Matching rows, best matches first
+    """
+    prefix = f"{user_field}__" if user_field else ""
+    words = search_words(terms)
+    if not words:
+        return queryset
+
+    names = [word for word in words if not word.isdigit()]
+    ids = [word for word in words if word.isdigit()]
+
+    if ids:
+        queryset = queryset.annotate(id_text=Cast(f"{prefix}id_no", output_field=TextField()))
+        for word in ids:
+            queryset = queryset.filter(id_text__startswith=word)
+    if not names:
+        return queryset.order_by("id_text")
+
+    query = SearchQuery(" & ".join(f"{word}:*" for word in names), search_type="raw", config="simple")
+    for word in names:
+        queryset = queryset.filter(
+            Q(**{f"{prefix}search_vector": SearchQuery(f"{word}:*", search_type="raw", config="simple")})
+            | Q(**{f"{prefix}first_name__trigram_word_similar": word})
+            | Q(**{f"{prefix}last_name__trigram_word_similar": word})
+        )
+    full_name = Concat(F(f"{prefix}first_name"), Value(" "), F(f"{prefix}last_name"), output_field=TextField())
+    return queryset.annotate(
+        search_rank=SearchRank(F(f"{prefix}search_vector"), query)
+        + TrigramWordSimilarity(" ".join(names), full_name)
+    ).order_by("-search_rank", f"{prefix}last_name", f"{prefix}first_name")
+
+
+class UserSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that uses search_users() on PostgreSQL.
+
+    Views set `search_user_field` to the path of the user from their model
+    ("user" by default); `search_fields` is still used by the fallback.
+    """
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view: Any) -> QuerySet:
+        terms = self.get_search_terms(request)
+        if not terms or connection.vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+        return search_users(queryset, terms, getattr(view, "search_user_field", "user"))
@@ -0,0 +1,194 @@
+from smtplib import SMTPException
+from typing import Any, Dict, List
+
+from celery import Task, shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from loguru import logger
+
+from .email_rendering import render_emails
+from .images import generate_derivatives
+from .media_storage import get_media_storage
+from .uploads import discard_staged, open_staged, purge_stale_uploads, staged_path
+
+def build_email(subject: str, recipient_list: List[str], html_email: str, plain_email: str, connection: Any) -> EmailMultiAlternatives:
+    """Build a multipart email with plain-text and HTML bodies."""
+    email = EmailMultiAlternatives(
+        subject, plain_email, settings.DEFAULT_FROM_EMAIL, recipient_list, connection=connection
+    )
+    email.attach_alternative(html_email, "text/html")
+    return email
+
+def get_worker_connection() -> Any:
+    """
+    Open the connection workers deliver mail through.
+
+    CELERY_EMAIL_BACKEND is used directly so messages are not queued a
+    second time by djcelery_email.
+    """
+    return get_connection(
+        getattr(settings, "CELERY_EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+    )
+
+@shared_task(
+    name="send_templated_email",
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def send_templated_email(subject: str, template_name: str, recipient_list: List[str], context: Dict[str, Any]) -> None:
+    """
+    Render an email template and deliver it over SMTP from the worker.
+
+    SMTP and socket errors are retried with exponential backoff.
+    """
+    send_templated_email_batch(subject, template_name, [[recipient_list, context]])
+
+@shared_task(bind=True, name="send_templated_email_batch", max_retries=5)
+def send_templated_email_batch(self: Task, subject: str, template_name: str, messages: List[List[Any]]) -> None:
+    """
+    Render one template for many recipients and send over a single connection.
+
+    Emails are sent one at a time, and on SMTP or socket errors only the
+    ones not sent yet are retried, with exponential backoff. The email that
+    was in flight when the error hit is sent again, so a recipient gets at
+    most one duplicate per retry.
+
+    Args:
+        messages: [recipient_list, context] pairs, one per email
+    """
+    rendered = render_emails(template_name, [context for _, context in messages])
+    connection = get_worker_connection()
+    emails = [
+        build_email(subject, recipient_list, html_email, plain_email, connection)
+        for (recipient_list, _), (html_email, plain_email) in zip(messages, rendered)
+    ]
+    sent = 0
+    try:
+        connection.open()
+        for email in emails:
+            connection.send_messages([email])
+            sent += 1
+    except (SMTPException, OSError) as e:
+        logger.error(f"{template_name} failed after {sent} of {len(emails)} email(s), retrying the rest: {str(e)}")
+        raise self.retry(
+            args=(subject, template_name, messages[sent:]),
+            exc=e,
+            countdown=get_exponential_backoff_interval(
+                factor=1, retries=self.request.retries, maximum=600, full_jitter=True
+            ),
+        )
+    finally:
+        connection.close()
+    logger.info(f"{template_name} sent to {sent} recipient(s)")
+
+def upload_staged_photos(model_label: str, object_id: str, photos: Dict[str, str]) -> None:
+    """
+    Store staged photos and their resized variants in the media storage and
+    record them on a model instance.
+
+    The variants in settings.IMAGE_VARIANTS are rendered for all photos at
+    once (see images.py). Each file is memory-mapped and hashed without
+    being read into a bytes object first (see open_staged()); content the
+    storage already holds is not written again. `<field>` gets
+    the original's storage key, `<field>_url` its URL and
+    `<field>_<variant>_url` each variant's URL, where the model has such a
+    field. Staged files are removed once the instance is saved; on errors
+    they stay for the task's retries, and purge_staged_uploads removes
+    whatever is left behind.
+
+    Args:
+        model_label: "app_label.ModelName" of the instance
+        object_id: Primary key of the instance
+        photos: Maps field names to staging references
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=object_id).first()
+    if instance is None:
+        logger.error(f"{model_label} {object_id} no longer exists; dropping its staged photos")
+        for reference in photos.values():
+            discard_staged(reference)
+        return
+
+    storage = get_media_storage()
+    sources = {field: staged_path(reference) for field, reference in photos.items()}
+    derivatives = generate_derivatives(sources.values())
+    model_fields = {field.name for field in model._meta.concrete_fields}
+
+    update_fields = []
+    reused = 0
+    for field, source in sources.items():
+        with open_staged(source.name) as image:
+            stored = storage.save(image, source.suffix)
+        reused += not stored.created
+        setattr(instance, field, stored.key)
+        setattr(instance, f"{field}_url", stored.url)
+        update_fields += [field, f"{field}_url"]
+
+        for variant, path in derivatives[source].items():
+            url_field = f"{field}_{variant}_url"
+            if url_field not in model_fields:
+                continue
+            with open_staged(path.name) as image:
+                stored = storage.save(image, path.suffix)
+            reused += not stored.created
+            setattr(instance, url_field, stored.url)
+            update_fields.append(url_field)
+
+    instance.save(update_fields=update_fields)
+    for source in sources.values():
+        discard_staged(source.name)
+        for path in derivatives[source].values():
+            discard_staged(path.name)
+    logger.info(f"Photos for {model_label} {object_id} stored ({reused} already present)")
+
+@shared_task(name="purge_staged_uploads")
+def purge_staged_uploads() -> int:
+    """Periodic task: delete staged uploads older than UPLOAD_STAGING_MAX_AGE."""
+    purged = purge_stale_uploads(int(settings.UPLOAD_STAGING_MAX_AGE.total_seconds()))
+    if purged:
+        logger.info(f"Purged {purged} stale staged uploads")
+    return purged
+
+@shared_task(name="flush_content_views")
+def flush_content_views() -> int:
+    """Periodic task: write buffered profile views to ContentView."""
+    # Imported here: view_buffer needs common.models, and this module is
+    # loaded while user_auth's models are still being imported
+    from .view_buffer import flush_view_buffer
+
+    flushed = flush_view_buffer()
+    if flushed:
+        logger.info(f"Flushed {flushed} buffered content views")
+    return flushed
+
+@shared_task(name="reconcile_unique_viewers")
+def reconcile_unique_viewers() -> Dict[str, int]:
+    """Periodic task: add ContentView rows missing from the unique-viewer sketches."""
+    from .unique_viewers import reconcile_unique_viewers as reconcile
+
+    stats = reconcile()
+    logger.info(f"Checked unique viewers of {stats['objects']} objects, repaired {stats['repaired']}")
+    return stats
+
+@shared_task(name="rollup_content_views")
+def rollup_content_views() -> int:
+    """Periodic task: count new views into the daily ContentViewDaily rollups."""
+    from .rollups import rollup_content_views as rollup
+
+    counted = rollup()
+    if counted:
+        logger.info(f"Rolled up {counted} content views")
+    return counted
+
+@shared_task(name="purge_content_views")
+def purge_content_views() -> int:
+    """Periodic task: delete raw views older than CONTENT_VIEW_RETENTION_MONTHS."""
+    from .rollups import purge_content_views as purge
+
+    purged = purge()
+    if purged:
+        logger.info(f"Purged {purged} content views past retention")
+    return purged
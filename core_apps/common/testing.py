@@ -0,0 +1,92 @@
+"""
+Test helpers shared by the apps' test modules.
+"""
+
+from typing import Any, Dict
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .mixins import QueryBudgetExceeded
+
+User = get_user_model()
+
+
+def create_test_user(prefix: str, index: int, **extra_fields: Any) -> Any:
+    """Create a user whose email, names and id_no are unique per (prefix, index)."""
+    return User.objects.create_user(
+        email=f"{prefix}-{index}@example.com",
+        password="s3cret-Passw0rd",
+        first_name=f"First{index}",
+        last_name=f"Last{index}",
+        id_no=20_000_000 + index,
+        security_question=User.SecurityQuestions.BIRTH_CITY,
+        security_answer="Nairobi",
+        **extra_fields,
+    )
+
+
+class ProfileListQueryTestMixin:
+    """
+    Query-count tests for a profile list endpoint.
+
+    Mix into a TestCase and set the class attributes; the mixin itself is
+    not a TestCase, so it is not collected on its own.
+    """
+    profile_model: Any
+    view_class: Any
+    role: str
+    path: str
+    # Queries a page costs, whatever its size (force_authenticate skips the user lookup)
+    list_queries: int
+
+    def profile_fields(self, index: int) -> Dict[str, Any]:
+        """Extra fields a profile needs to be saved, e.g. a unique slug."""
+        return {}
+
+    def create_profile(self, index: int, **extra_fields: Any) -> Any:
+        user = create_test_user(self.role.lower(), index, **extra_fields)
+        return self.profile_model.objects.create(user=user, **self.profile_fields(index))
+
+    def setUp(self) -> None:
+        self.viewer = self.create_profile(0, role=self.role)
+        # View counts come from Redis in one round trip, which is not a query
+        patcher = mock.patch(
+            "core_apps.common.unique_viewers.unique_viewer_counts",
+            lambda objects: {obj.pk: 7 for obj in objects},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def list_profiles(self, **initkwargs: Any) -> Any:
+        request = APIRequestFactory().get(self.path, {"page_size": 50})
+        force_authenticate(request, user=self.viewer.user)
+        return self.view_class.as_view(**initkwargs)(request)
+
+    def test_queries_do_not_grow_with_the_page(self) -> None:
+        for index in range(1, 3):
+            self.create_profile(index)
+        with CaptureQueriesContext(connection) as few:
+            response = self.list_profiles()
+            b"".join(response.streaming_content)
+
+        for index in range(3, 30):
+            self.create_profile(index)
+        with self.assertNumQueries(self.list_queries):
+            response = self.list_profiles()
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"First29 Last29", body)
+        self.assertIn(b'"view_count":7', body)
+        self.assertEqual(len(few), self.list_queries)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_raises_before_streaming(self) -> None:
+        self.create_profile(1)
+        with self.assertRaises(QueryBudgetExceeded):
+            self.list_profiles(query_budget={"GET": 1})
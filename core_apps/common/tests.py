@@ -0,0 +1,185 @@
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from unittest import skipUnless
+
+from django.db import DataError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .middleware import PerformanceMiddleware
+from .models import ContentView, ContentViewDaily
+from .rollups import _add_to_rollups
+from .search import search_users
+from .user_cache import cache_user, get_cached_user
+from .view_buffer import _upsert_views, clean_viewer_ip, decode_view_key, encode_view_key
+
+User = get_user_model()
+
+
+class DirtyFieldsMixinTests(TestCase):
+    def setUp(self) -> None:
+        self.view = ContentView.objects.create(
+            content_type=ContentType.objects.get_for_model(ContentView),
+            object_id=uuid.uuid4(),
+            viewer_ip="10.0.0.1",
+            last_viewed=timezone.now(),
+        )
+
+    def test_unchanged_save_issues_no_query(self) -> None:
+        view = ContentView.objects.get(pk=self.view.pk)
+        with self.assertNumQueries(0):
+            view.save()
+
+    def test_save_writes_only_changed_columns(self) -> None:
+        view = ContentView.objects.get(pk=self.view.pk)
+        view.viewer_ip = "10.0.0.2"
+        with self.assertNumQueries(1):
+            view.save()
+        view.refresh_from_db()
+        self.assertEqual(view.viewer_ip, "10.0.0.2")
+
+    def test_deferred_load_keeps_pending_changes(self) -> None:
+        view = ContentView.objects.only("viewer_ip").get(pk=self.view.pk)
+        view.viewer_ip = "10.0.0.3"
+        # Loads the deferred field through refresh_from_db(fields=[...])
+        view.last_viewed
+        self.assertTrue(view.has_field_changed("viewer_ip"))
+
+        view.save()
+        self.assertEqual(ContentView.objects.get(pk=self.view.pk).viewer_ip, "10.0.0.3")
+
+
+class UserCacheTests(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            email="cached@example.com",
+            password="s3cret-Passw0rd",
+            first_name="Cached",
+            last_name="User",
+            id_no=12345678,
+            security_question=User.SecurityQuestions.BIRTH_CITY,
+            security_answer="Nairobi",
+        )
+
+    def test_cached_user_has_no_password_hash(self) -> None:
+        cache_user(User.objects.get(pk=self.user.pk))
+        cached = get_cached_user(self.user.pk)
+        self.assertIn("password", cached.get_deferred_fields())
+        self.assertNotIn("password", cached._loaded_values)
+        self.assertIn("search_vector", cached.get_deferred_fields())
+
+        with self.assertNumQueries(1):
+            self.assertTrue(cached.check_password("s3cret-Passw0rd"))
+
+
+@skipUnless(connection.vendor == "postgresql", "search_users() needs PostgreSQL full-text and trigram search")
+class SearchUsersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.users = {}
+        for index, (first_name, last_name) in enumerate(
+            [("Jonathan", "Smith"), ("Smith", "Jones"), ("Mary", "Wanjiku"), ("Jon", "Otieno")]
+        ):
+            cls.users[first_name] = User.objects.create_user(
+                email=f"search-{index}@example.com",
+                password="s3cret-Passw0rd",
+                first_name=first_name,
+                last_name=last_name,
+                id_no=31_000_000 + index * 1_000,
+                security_question=User.SecurityQuestions.BIRTH_CITY,
+                security_answer="Nairobi",
+            )
+
+    def search(self, *terms: str):
+        return list(search_users(User.objects.all(), list(terms)))
+
+    def test_exact_name_ranks_above_prefix_matches(self) -> None:
+        results = self.search("jon")
+        self.assertEqual(results[0], self.users["Jon"])
+        self.assertCountEqual(results, [self.users["Jon"], self.users["Jonathan"], self.users["Smith"]])
+
+    def test_every_word_must_match(self) -> None:
+        self.assertEqual(self.search("jonathan", "smith"), [self.users["Jonathan"]])
+
+    def test_name_with_a_typo_is_found(self) -> None:
+        self.assertIn(self.users["Mary"], self.search("wanjku"))
+
+    def test_digits_are_id_number_prefixes(self) -> None:
+        self.assertEqual(self.search("31002"), [self.users["Mary"]])
+        self.assertEqual(len(self.search("3100")), 4)
+
+
+class ViewBufferTests(TestCase):
+    def test_view_key_round_trip(self) -> None:
+        object_id, user_id = uuid.uuid4(), uuid.uuid4()
+        self.assertEqual(
+            decode_view_key(encode_view_key(7, object_id, user_id, "10.0.0.1")),
+            (7, str(object_id), str(user_id), "10.0.0.1"),
+        )
+        self.assertEqual(decode_view_key(encode_view_key(7, object_id, None, None)), (7, str(object_id), None, None))
+
+    def test_invalid_view_keys_raise_value_error(self) -> None:
+        for field in (b"7|x||", b"[7, \"not-a-uuid\", null, null]", b"[7, null]"):
+            with self.assertRaises(ValueError):
+                decode_view_key(field)
+
+    def test_invalid_ips_are_not_buffered(self) -> None:
+        self.assertEqual(clean_viewer_ip(" 10.0.0.1 "), "10.0.0.1")
+        self.assertIsNone(clean_viewer_ip("10.0.0.1, 10.0.0.2"))
+        self.assertIsNone(clean_viewer_ip("unknown"))
+
+    def test_failed_batch_is_written_one_by_one(self) -> None:
+        content_type = ContentType.objects.get_for_model(ContentView)
+        user = User.objects.create_user(
+            email="viewer@example.com",
+            password="s3cret-Passw0rd",
+            first_name="View",
+            last_name="Er",
+            id_no=87654321,
+            security_question=User.SecurityQuestions.BIRTH_CITY,
+            security_answer="Nairobi",
+        )
+        views = {
+            (content_type.pk, str(uuid.uuid4()), str(user.pk), "10.0.0.1"): timezone.now(),
+            (content_type.pk, str(uuid.uuid4()), str(user.pk), "10.0.0.2"): timezone.now(),
+        }
+        with mock.patch.object(ContentView.objects, "bulk_create", side_effect=DataError("invalid input")):
+            self.assertEqual(_upsert_views(views, batch_size=10), 2)
+        self.assertEqual(ContentView.objects.filter(user=user).count(), 2)
+
+
+class RollupTests(TestCase):
+    def test_counts_are_added_to_existing_rows(self) -> None:
+        content_type_id = ContentType.objects.get_for_model(ContentView).pk
+        first, second = uuid.uuid4(), uuid.uuid4()
+        day = timezone.localdate()
+
+        _add_to_rollups({(content_type_id, first, day): (2, 1)})
+        _add_to_rollups({(content_type_id, first, day): (3, 0), (content_type_id, second, day): (1, 1)})
+
+        self.assertEqual(
+            sorted(ContentViewDaily.objects.values_list("viewers", "authenticated_viewers")),
+            [(1, 1), (5, 1)],
+        )
+
+
+@override_settings(DEBUG=False, SERVER_TIMING_HEADER=False)
+class PerformanceMiddlewareTests(TestCase):
+    def test_unevaluated_user_is_not_loaded(self) -> None:
+        load_user = mock.Mock()
+        request = RequestFactory().get("/")
+        request.user = SimpleLazyObject(load_user)
+        response = PerformanceMiddleware(lambda request: HttpResponse())(request)
+        load_user.assert_not_called()
+        self.assertNotIn("Server-Timing", response)
+
+    def test_loaded_staff_user_gets_the_header(self) -> None:
+        request = RequestFactory().get("/")
+        request.user = User(is_staff=True)
+        response = PerformanceMiddleware(lambda request: HttpResponse())(request)
+        self.assertIn("Server-Timing", response)
@@ -0,0 +1,146 @@
+"""
+Request throttles backed by a token bucket in Redis.
+
+DRF's built-in throttles keep a list of request timestamps per client in the
+cache and rewrite it on every request, which is O(n) in the rate and, with
+a per-process cache, gives every worker its own limits. Here each client has
+one small Redis hash (tokens, updated_at) that a Lua script refills and
+debits atomically, so a check is a single round-trip and the limit is
+shared by every worker.
+
+Rates use DRF's "<count>/<period>" format from DEFAULT_THROTTLE_RATES: the
+bucket holds <count> tokens and refills at <count> per <period>.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from loguru import logger
+from redis.exceptions import RedisError
+from rest_framework.request import Request
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework.views import View
+
+# KEYS[1]: bucket key; ARGV: capacity, refill rate (tokens per second).
+# Uses the Redis server clock so all workers agree on elapsed time.
+# Returns {allowed (0/1), milliseconds until a token is available}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1])
+local updated_at = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    updated_at = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, wait}
+"""
+
+
+def get_throttle_redis():
+    """Return the Redis client that holds the throttle buckets."""
+    return get_redis_connection(getattr(settings, "THROTTLE_CACHE_ALIAS", "default"))
+
+
+@lru_cache(maxsize=None)
+def get_token_bucket_script():
+    """
+    Return the registered token-bucket script.
+
+    The script is sent by SHA (EVALSHA) and only falls back to loading its
+    source the first time a Redis server sees it.
+    """
+    return get_throttle_redis().register_script(TOKEN_BUCKET_SCRIPT)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle that decides with an atomic Redis token bucket.
+
+    Subclasses set `scope` and implement get_cache_key() exactly as with
+    DRF's throttles. If Redis is unreachable the request is allowed and the
+    error logged, so an outage of the throttle store does not take the API
+    down with it.
+    """
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def allow_request(self, request: Request, view: View) -> bool:
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self._wait = None
+        try:
+            allowed, wait_ms = get_token_bucket_script()(
+                keys=[self.key], args=[self.num_requests, self.num_requests / self.duration]
+            )
+        except RedisError as e:
+            logger.error(f"Throttle check failed for {self.key}: {str(e)}")
+            return True
+
+        if not allowed:
+            self._wait = int(wait_ms) / 1000
+            return False
+        return True
+
+    def wait(self) -> Optional[float]:
+        return self._wait
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """Limits unauthenticated requests per client IP."""
+    scope = "anon"
+
+    def get_cache_key(self, request: Request, view: View) -> Optional[str]:
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Limits authenticated requests per user, and anonymous ones per IP."""
+    scope = "user"
+
+    def get_cache_key(self, request: Request, view: View) -> Optional[str]:
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Per-IP limit for a single endpoint, named by `scope`."""
+
+    def get_cache_key(self, request: Request, view: View) -> Optional[str]:
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class LoginRateThrottle(IPTokenBucketThrottle):
+    scope = "login"
+
+
+class OTPVerifyRateThrottle(IPTokenBucketThrottle):
+    scope = "verify_otp"
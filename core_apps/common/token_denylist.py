@@ -0,0 +1,229 @@
+"""
+Revocation store for JWTs, checked on every authenticated request.
+
+The authoritative denylist lives in Redis: one key per revoked token id
+(jti) that expires together with the token, plus a sorted set of revoked
+jtis scored by expiry. Each process keeps a bloom filter of the revoked
+jtis, so the common "not revoked" answer is an in-memory bit test. Only
+tokens the filter reports as possibly revoked cost a Redis lookup.
+
+The filter is kept current by a background thread, never on the request
+path. revoke() publishes the jti on a Redis channel the thread subscribes
+to, so revocations from other workers reach the filter as soon as Redis
+delivers the message. The thread also rebuilds the filter from the sorted
+set every TOKEN_DENYLIST_SYNC_INTERVAL seconds, which drops expired tokens.
+Until the thread has built its first filter, or when it has lost its
+subscription, every token is checked against Redis.
+
+When Redis cannot be reached the denylist fails closed: a token that needs a
+Redis lookup, or a revocation, raises DenylistUnavailable (503) instead of
+being accepted unchecked. Tokens the bloom filter clears are still accepted.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from django_redis import get_redis_connection
+from loguru import logger
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.tokens import Token
+
+
+class DenylistUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Token revocation cannot be checked right now, try again later.")
+    default_code = "denylist_unavailable"
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings.
+
+    Sized for the expected number of items and false-positive rate, with
+    bit positions derived from one blake2b digest by double hashing.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenDenylist:
+    """
+    Redis-backed token denylist with a per-process bloom filter in front.
+    """
+    key_prefix = "token-denylist"
+
+    def __init__(self) -> None:
+        self.capacity = getattr(settings, "TOKEN_DENYLIST_CAPACITY", 100_000)
+        self.error_rate = getattr(settings, "TOKEN_DENYLIST_ERROR_RATE", 0.001)
+        self.sync_interval = getattr(settings, "TOKEN_DENYLIST_SYNC_INTERVAL", 5)
+        # Set by the sync thread while its subscription is live, None otherwise
+        self._filter: Optional[BloomFilter] = None
+        self._sync_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def redis(self):
+        return get_redis_connection(getattr(settings, "TOKEN_DENYLIST_CACHE_ALIAS", "default"))
+
+    @property
+    def log_key(self) -> str:
+        return f"{self.key_prefix}:log"
+
+    @property
+    def channel(self) -> str:
+        return f"{self.key_prefix}:revoked"
+
+    def token_key(self, jti: str) -> str:
+        return f"{self.key_prefix}:{jti}"
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        """
+        Revoke a token id until its expiry.
+
+        The token key is set with NX, so of several concurrent revocations of
+        the same token exactly one reports that it revoked it.
+
+        Args:
+            jti: The token's unique identifier
+            expires_at: The token's "exp" claim as a unix timestamp
+
+        Returns:
+            True if this call revoked the token, False if it was already
+            revoked or has expired
+
+        Raises:
+            DenylistUnavailable: If Redis cannot be reached
+        """
+        ttl = int(expires_at - time.time())
+        if ttl <= 0:
+            return False
+        try:
+            pipe = self.redis.pipeline()
+            pipe.set(self.token_key(jti), 1, ex=ttl, nx=True)
+            pipe.zadd(self.log_key, {jti: expires_at})
+            pipe.publish(self.channel, jti)
+            newly_revoked = pipe.execute()[0]
+        except RedisError as e:
+            logger.error(f"Token revocation failed for {jti}: {str(e)}")
+            raise DenylistUnavailable()
+        bloom = self._filter
+        if bloom is not None:
+            bloom.add(jti)
+        return bool(newly_revoked)
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Return True if the token id has been revoked and not yet expired.
+
+        Raises:
+            DenylistUnavailable: If the token needs a Redis lookup and Redis
+                cannot be reached
+        """
+        self.start_sync()
+        bloom = self._filter
+        if bloom is not None and jti not in bloom:
+            return False
+        try:
+            return bool(self.redis.exists(self.token_key(jti)))
+        except RedisError as e:
+            logger.error(f"Token denylist check failed for {jti}: {str(e)}")
+            raise DenylistUnavailable()
+
+    def start_sync(self) -> None:
+        """Start this process's sync thread, once per process (after a fork too)."""
+        pid = os.getpid()
+        if self._sync_pid == pid:
+            return
+        with self._lock:
+            if self._sync_pid == pid:
+                return
+            # A filter inherited from the parent process is no longer synced
+            self._filter = None
+            self._sync_pid = pid
+            threading.Thread(target=self._sync_forever, name="token-denylist-sync", daemon=True).start()
+
+    def _sync_forever(self) -> None:
+        while True:
+            try:
+                self._sync()
+            except Exception as e:
+                logger.error(f"Token denylist sync failed, checking every token in Redis: {str(e)}")
+            self._filter = None
+            time.sleep(self.sync_interval)
+
+    def _sync(self) -> None:
+        """Follow the revocation channel, rebuilding the filter every sync_interval."""
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            # Subscribe before reading the sorted set so no revocation falls in between
+            pubsub.subscribe(self.channel)
+            while True:
+                bloom = self._filter = self._build_filter()
+                rebuild_at = time.monotonic() + self.sync_interval
+                while (timeout := rebuild_at - time.monotonic()) > 0:
+                    message = pubsub.get_message(timeout=timeout)
+                    if message is not None:
+                        jti = message["data"]
+                        bloom.add(jti.decode("utf-8") if isinstance(jti, bytes) else jti)
+        finally:
+            pubsub.close()
+
+    def _build_filter(self) -> BloomFilter:
+        pipe = self.redis.pipeline()
+        pipe.zremrangebyscore(self.log_key, "-inf", time.time())
+        pipe.zrange(self.log_key, 0, -1)
+        _, members = pipe.execute()
+        bloom = BloomFilter(max(self.capacity, len(members)), self.error_rate)
+        bloom.update(member.decode("utf-8") if isinstance(member, bytes) else member for member in members)
+        return bloom
+
+
+@lru_cache(maxsize=None)
+def get_token_denylist() -> TokenDenylist:
+    """Return the process-wide token denylist."""
+    return TokenDenylist()
+
+
+def revoke_token(token: Token) -> bool:
+    """
+    Add a validated token to the denylist until it expires.
+
+    Returns:
+        True if this call revoked the token, False if it was already revoked
+    """
+    return get_token_denylist().revoke(str(token["jti"]), int(token["exp"]))
+
+
+def is_token_revoked(token: Token) -> bool:
+    """Return True if the validated token has been revoked."""
+    jti = token.get("jti")
+    return jti is not None and get_token_denylist().is_revoked(str(jti))
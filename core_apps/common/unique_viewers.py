@@ -0,0 +1,142 @@
+"""
+Approximate unique-viewer counts, kept in Redis HyperLogLog sketches.
+
+Each viewed object has one sketch ("unique-viewers:<content type>:<id>")
+holding its viewers, identified the same way ContentView rows are: by user
+and viewer IP. buffer_view() adds the viewer with PFADD in the same round
+trip that buffers the view, so counts include views not yet flushed to
+ContentView. A count is one PFCOUNT, O(1) and about 12 KB per sketch at
+most, with a standard error of 0.81%.
+
+Sketches can fall behind ContentView when views were written directly
+while Redis was unavailable, or after Redis lost data.
+reconcile_unique_viewers() re-adds every ContentView row to its sketch;
+adding a viewer twice has no effect, so it is safe to run at any time.
+"""
+
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from django_redis import get_redis_connection
+from loguru import logger
+from redis.exceptions import RedisError
+from rest_framework import serializers
+
+from .models import ContentView
+
+KEY_PREFIX = "unique-viewers"
+
+
+def get_unique_viewers_redis():
+    """Return the Redis client holding the sketches (the view buffer's)."""
+    return get_redis_connection(getattr(settings, "CONTENT_VIEW_BUFFER_CACHE_ALIAS", "default"))
+
+
+def viewers_key(content_type_id: int, object_id: Any) -> str:
+    return f"{KEY_PREFIX}:{content_type_id}:{object_id}"
+
+
+def viewer_member(user_id: Any, viewer_ip: Optional[str]) -> str:
+    """The sketch element for a viewer; one per distinct ContentView row."""
+    return f"{user_id or ''}|{viewer_ip or ''}"
+
+
+def add_viewer(redis: Any, content_type_id: int, object_id: Any, user_id: Any, viewer_ip: Optional[str]) -> None:
+    """Add a viewer to an object's sketch on `redis` (a client or pipeline)."""
+    redis.pfadd(viewers_key(content_type_id, object_id), viewer_member(user_id, viewer_ip))
+
+
+def _count_from_views(content_type: ContentType, object_ids: List[Any]) -> Dict[Any, int]:
+    """Exact counts from ContentView, in one grouped query."""
+    rows = (
+        ContentView.objects.filter(content_type=content_type, object_id__in=object_ids)
+        .order_by()
+        .values_list("object_id")
+        .annotate(count=Count("pk"))
+    )
+    counts = dict.fromkeys(object_ids, 0)
+    counts.update(rows)
+    return counts
+
+
+def unique_viewer_counts(objects: Iterable[Any]) -> Dict[Any, int]:
+    """
+    Return approximate unique-viewer counts for objects of one model.
+
+    All sketches are counted in a single pipelined round trip. If Redis is
+    unavailable the exact counts are read from ContentView instead.
+
+    Returns:
+        Dict[Any, int]: object pk -> count
+    """
+    objects = list(objects)
+    if not objects:
+        return {}
+    content_type = ContentType.objects.get_for_model(objects[0])
+    object_ids = [obj.pk for obj in objects]
+    try:
+        with get_unique_viewers_redis().pipeline(transaction=False) as pipe:
+            for object_id in object_ids:
+                # One PFCOUNT per key: with several keys PFCOUNT counts their union
+                pipe.pfcount(viewers_key(content_type.pk, object_id))
+            return dict(zip(object_ids, pipe.execute()))
+    except RedisError as e:
+        logger.error(f"Could not read unique viewer counts, counting ContentView rows: {str(e)}")
+        return _count_from_views(content_type, object_ids)
+
+
+def unique_viewer_count(obj: Any) -> int:
+    """Return the approximate unique-viewer count of a single object."""
+    return unique_viewer_counts([obj])[obj.pk]
+
+
+class UniqueViewerListSerializer(serializers.ListSerializer):
+    """
+    List serializer that fetches the view counts of all its instances in
+    one round trip and sets them as `view_count` before serializing.
+
+    Child serializers read obj.view_count and call unique_viewer_count()
+    only when it is missing.
+    """
+
+    def to_representation(self, data: Any) -> List[Any]:
+        instances = list(data.all() if hasattr(data, "all") else data)
+        counts = unique_viewer_counts(instances)
+        for obj in instances:
+            obj.view_count = counts[obj.pk]
+        return super().to_representation(instances)
+
+
+def reconcile_unique_viewers(batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Add every ContentView row to its object's sketch.
+
+    Rows are read in (content_type, object_id) order, which the unique index
+    on ContentView provides, and each object's viewers are sent with one
+    PFADD; pipelines are flushed every `batch_size` objects.
+
+    Returns:
+        Dict[str, int]: "objects" checked and "repaired" sketches, i.e. ones
+        that were missing at least one viewer
+    """
+    redis = get_unique_viewers_redis()
+    rows = (
+        ContentView.objects.order_by("content_type_id", "object_id")
+        .values_list("content_type_id", "object_id", "user_id", "viewer_ip")
+        .iterator(chunk_size=batch_size)
+    )
+    stats = {"objects": 0, "repaired": 0}
+    pipe = redis.pipeline(transaction=False)
+    for (content_type_id, object_id), views in groupby(rows, key=itemgetter(0, 1)):
+        members = {viewer_member(user_id, viewer_ip) for _, _, user_id, viewer_ip in views}
+        pipe.pfadd(viewers_key(content_type_id, object_id), *members)
+        stats["objects"] += 1
+        if len(pipe) >= batch_size:
+            stats["repaired"] += sum(pipe.execute())
+    if len(pipe):
+        stats["repaired"] += sum(pipe.execute())
+    return stats
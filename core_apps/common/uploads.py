@@ -0,0 +1,129 @@
+"""
+Staging area for uploaded files handed to Celery workers.
+
+Request handlers stream an upload to disk chunk by chunk with stage_upload()
+and pass only the returned reference (a file name) in the task message. The
+worker maps the staged file into memory with open_staged() and removes it
+with discard_staged() once it is done. The staging directory must be shared
+between the web and worker containers (settings.UPLOAD_STAGING_ROOT).
+"""
+
+import mmap
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.uploadedfile import UploadedFile
+
+
+def get_staging_root() -> Path:
+    """Return the staging directory, creating it if needed."""
+    root = Path(settings.UPLOAD_STAGING_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def staged_path(reference: str) -> Path:
+    """
+    Resolve a staging reference to its path.
+
+    Raises:
+        SuspiciousFileOperation: If the reference is not a plain file name
+    """
+    if not reference or reference != os.path.basename(reference) or reference.startswith("."):
+        raise SuspiciousFileOperation(f"Invalid staging reference: {reference!r}")
+    return get_staging_root() / reference
+
+
+def stage_upload(uploaded_file: UploadedFile, prefix: str = "") -> str:
+    """
+    Write an uploaded file into the staging area.
+
+    Uploads Django already spooled to a temporary file are hard-linked when
+    the staging directory is on the same filesystem; otherwise the file is
+    copied in upload-handler sized chunks, so it is never held in memory as
+    a whole. The file only appears under its final name once complete.
+
+    Args:
+        uploaded_file: The file from request.FILES / validated_data
+        prefix: Prepended to the generated name, for easier debugging
+
+    Returns:
+        str: The staging reference to hand to the worker
+    """
+    root = get_staging_root()
+    suffix = Path(uploaded_file.name or "").suffix.lower()[:10]
+    reference = f"{prefix}{uuid.uuid4().hex}{suffix}"
+    destination = root / reference
+
+    temporary_path = getattr(uploaded_file, "temporary_file_path", None)
+    if temporary_path is not None:
+        try:
+            os.link(temporary_path(), destination)
+            return reference
+        except OSError:
+            pass
+
+    fd, partial_path = tempfile.mkstemp(dir=root, prefix=".partial-")
+    try:
+        with os.fdopen(fd, "wb") as staged:
+            for chunk in uploaded_file.chunks():
+                staged.write(chunk)
+        os.replace(partial_path, destination)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.unlink(partial_path)
+        raise
+    return reference
+
+
+@contextmanager
+def open_staged(reference: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Map a staged file read-only into memory.
+
+    The mapping is backed by the page cache, so hashing the file and
+    writing it to local storage need no copy in the worker's heap.
+    Cloudinary uploads still copy it, into the multipart request body.
+    """
+    with open(staged_path(reference), "rb") as staged:
+        if os.fstat(staged.fileno()).st_size == 0:
+            # Zero-length files cannot be mapped
+            yield b""
+            return
+        with mmap.mmap(staged.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def discard_staged(reference: str) -> None:
+    """Delete a staged file; missing files are ignored."""
+    try:
+        staged_path(reference).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def purge_stale_uploads(max_age: int) -> int:
+    """
+    Delete staged files older than `max_age` seconds, left behind by workers
+    that gave up or died.
+
+    Returns:
+        int: The number of files deleted
+    """
+    cutoff = time.time() - max_age
+    purged = 0
+    for entry in os.scandir(get_staging_root()):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.unlink(entry.path)
+                purged += 1
+            except FileNotFoundError:
+                pass
+    return purged
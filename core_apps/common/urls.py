@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import ContentViewStatsView, SlowRequestListView
+
+urlpatterns = [
+    path("slow-requests/", SlowRequestListView.as_view(), name="slow-requests"),
+    path("content-views/", ContentViewStatsView.as_view(), name="content-view-stats"),
+]
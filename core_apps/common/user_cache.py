@@ -0,0 +1,84 @@
+"""
+Short-lived cache of authenticated users, keyed by user id.
+
+CookieAuthentication resolves the user behind a validated JWT through this
+cache instead of querying the users table on every request. Entries are
+dropped whenever the user row is saved or deleted, and by the code paths
+that change account state with QuerySet.update(), so status, role, activity
+and password changes take effect immediately.
+"""
+
+import copy
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .instrumentation import record_cache_access
+
+# Never written to the cache; "_password" holds a raw password set in this
+# request, and the search vector is only used inside search queries
+UNCACHED_FIELDS = ("password", "_password", "search_vector")
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def get_user_cache():
+    """Return the cache that holds authenticated users."""
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+
+def user_cache_key(user_id: Any) -> str:
+    """Build the cache key for a user id."""
+    return f"auth-user:{user_id}"
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def get_cached_user(user_id: Any) -> Optional[Any]:
+    """Return the cached user for the id, or None on a miss."""
+    user = get_user_cache().get(user_cache_key(user_id))
+    _count("hits" if user is not None else "misses")
+    record_cache_access(user is not None)
+    return user
+
+
+def cache_user(user: Any) -> None:
+    """
+    Store a freshly loaded user for settings.AUTH_USER_CACHE_TIMEOUT seconds.
+
+    The password hash and the name search vector are left out of the cached
+    copy: they are deferred fields there, loaded from the database only
+    when something reads them, such as a password check.
+    """
+    timeout = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+    cached = copy.copy(user)
+    for attname in UNCACHED_FIELDS:
+        cached.__dict__.pop(attname, None)
+    if getattr(user, "_loaded_values", None) is not None:
+        # DirtyFieldsMixin's snapshot holds the hash too
+        cached._loaded_values = {
+            attname: value for attname, value in user._loaded_values.items() if attname not in UNCACHED_FIELDS
+        }
+    get_user_cache().set(user_cache_key(user.pk), cached, timeout=timeout)
+
+
+def invalidate_cached_user(user_id: Any) -> None:
+    """Drop the cached user for the id."""
+    get_user_cache().delete(user_cache_key(user_id))
+
+
+def invalidate_cached_users(user_ids: Iterable[Any]) -> None:
+    """Drop the cached users for many ids at once."""
+    get_user_cache().delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+def get_user_cache_stats() -> Dict[str, int]:
+    """Return this process's hit and miss counters."""
+    with _stats_lock:
+        return dict(_stats)
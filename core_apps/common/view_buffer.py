@@ -0,0 +1,269 @@
+"""
+Write-behind buffer for ContentView.
+
+Recording a view on the request path is a single HSET into a Redis hash
+keyed by (content type, object, user, viewer IP), holding the time of the
+latest view. The flush_content_views task periodically moves the hash aside
+with RENAME and writes its entries to ContentView with batched upserts that
+set last_viewed, so reads of hot profiles cause no database writes and no
+row contention. Views become visible in ContentView after the next flush.
+
+Only one flush runs at a time: each takes a Redis lock (SET NX with a
+timeout of CONTENT_VIEW_FLUSH_LOCK_TIMEOUT seconds) and a flush that finds
+it taken does nothing, so overlapping flushes never process or delete each
+other's hashes. If a flush fails, the renamed hash is kept and retried by
+the next flush.
+Entries that can never be written (undecodable fields, or views by users
+deleted before the flush) are logged and dropped instead, so one bad entry
+cannot hold back the others. If Redis is unavailable when a view is
+recorded, it is written directly.
+The viewer is also added to the object's unique-viewer sketch in the same
+round trip (see unique_viewers.py).
+"""
+
+import ipaddress
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from loguru import logger
+from redis.exceptions import LockError, RedisError
+
+from .models import ContentView
+from .unique_viewers import add_viewer
+
+User = get_user_model()
+
+PENDING_KEY = "content-views:pending"
+FLUSHING_PREFIX = "content-views:flushing"
+FLUSH_LOCK_KEY = "content-views:flush-lock"
+
+ViewKey = Tuple[int, str, Optional[str], Optional[str]]
+
+
+def get_view_buffer_redis():
+    """Return the Redis client that holds buffered views."""
+    return get_redis_connection(getattr(settings, "CONTENT_VIEW_BUFFER_CACHE_ALIAS", "default"))
+
+
+def clean_viewer_ip(viewer_ip: Optional[str]) -> Optional[str]:
+    """Return the IP address in canonical form, or None if it is not a valid one."""
+    if not viewer_ip:
+        return None
+    try:
+        return str(ipaddress.ip_address(viewer_ip.strip()))
+    except ValueError:
+        return None
+
+
+def encode_view_key(content_type_id: int, object_id: Any, user_id: Any, viewer_ip: Optional[str]) -> bytes:
+    return orjson.dumps([content_type_id, str(object_id), str(user_id) if user_id else None, viewer_ip])
+
+
+def decode_view_key(field: bytes) -> ViewKey:
+    """
+    Decode and check a buffered view's hash field.
+
+    Raises:
+        ValueError: If the field is not a valid view key
+    """
+    try:
+        content_type_id, object_id, user_id, viewer_ip = orjson.loads(field)
+        return (
+            int(content_type_id),
+            str(uuid.UUID(object_id)),
+            str(uuid.UUID(user_id)) if user_id else None,
+            str(ipaddress.ip_address(viewer_ip)) if viewer_ip else None,
+        )
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid view key {field!r}: {e}") from e
+
+
+def buffer_view(content_object: Any, user: Optional[Any], viewer_ip: Optional[str] = None) -> None:
+    """
+    Record a view of `content_object` without touching the database.
+
+    Args:
+        content_object: The object being viewed
+        user: The viewing user, or None/anonymous
+        viewer_ip: IP address of the viewer (optional)
+    """
+    if user is not None and not user.is_authenticated:
+        user = None
+    # get_for_model() is served from ContentType's in-process cache
+    content_type = ContentType.objects.get_for_model(content_object)
+    user_id = getattr(user, "pk", None)
+    viewer_ip = clean_viewer_ip(viewer_ip)
+    buffered = getattr(settings, "CONTENT_VIEW_BUFFER_ENABLED", True)
+    try:
+        with get_view_buffer_redis().pipeline(transaction=False) as pipe:
+            if buffered:
+                field = encode_view_key(content_type.pk, content_object.pk, user_id, viewer_ip)
+                pipe.hset(PENDING_KEY, field, timezone.now().timestamp())
+            add_viewer(pipe, content_type.pk, content_object.pk, user_id, viewer_ip)
+            pipe.execute()
+    except RedisError as e:
+        logger.error(f"Could not buffer content view, writing it directly: {str(e)}")
+        buffered = False
+    if not buffered:
+        ContentView.record_view(content_object, user, viewer_ip)
+
+
+def _claim_batches() -> List[str]:
+    """
+    Move the pending hash aside and return every hash waiting to be flushed,
+    including ones left behind by failed flushes.
+    """
+    redis = get_view_buffer_redis()
+    flushing_key = f"{FLUSHING_PREFIX}:{uuid.uuid4().hex}"
+    try:
+        redis.rename(PENDING_KEY, flushing_key)
+    except RedisError:
+        # Nothing was buffered since the last flush
+        pass
+    return [key.decode("utf-8") for key in redis.scan_iter(match=f"{FLUSHING_PREFIX}:*")]
+
+
+def _drop_missing_references(views: Dict[ViewKey, datetime]) -> None:
+    """Remove views whose content type or user no longer exists, which could never be written."""
+    content_type_ids = set(ContentType.objects.filter(
+        pk__in={key[0] for key in views}
+    ).values_list("pk", flat=True))
+    user_ids = {str(pk) for pk in User.objects.filter(
+        pk__in={key[2] for key in views if key[2] is not None}
+    ).values_list("pk", flat=True)}
+    for key in list(views):
+        content_type_id, _, user_id, _ = key
+        if content_type_id not in content_type_ids or (user_id is not None and user_id not in user_ids):
+            logger.warning(f"Dropping buffered view {key}: its content type or user no longer exists")
+            del views[key]
+
+
+def _write_view(view: ContentView, now: datetime) -> None:
+    """Write one view, updating its row if there is one."""
+    with transaction.atomic():
+        updated = ContentView.objects.filter(
+            content_type_id=view.content_type_id,
+            object_id=view.object_id,
+            user_id=view.user_id,
+            viewer_ip=view.viewer_ip,
+        ).update(last_viewed=view.last_viewed, updated_at=now)
+        if not updated:
+            view.save()
+
+
+def _write_views_one_by_one(views: List[ContentView], now: datetime) -> int:
+    """Write views in separate transactions, dropping the ones that fail; returns the number written."""
+    written = 0
+    for view in views:
+        try:
+            _write_view(view, now)
+            written += 1
+        except (DatabaseError, ValidationError, ValueError) as e:
+            logger.error(
+                f"Dropping buffered view of {view.content_type_id}:{view.object_id} "
+                f"by {view.user_id or view.viewer_ip}: {str(e)}"
+            )
+    return written
+
+
+def _upsert_views(views: Dict[ViewKey, datetime], batch_size: int) -> int:
+    """
+    Write views to ContentView, one INSERT ... ON CONFLICT per batch.
+
+    Each batch is its own transaction. A batch that fails is retried one
+    view at a time, and views that still fail are logged and dropped.
+
+    Returns:
+        int: The number of views written
+    """
+    now = timezone.now()
+    with_nulls = []
+    rows = []
+    for (content_type_id, object_id, user_id, viewer_ip), last_viewed in views.items():
+        view = ContentView(
+            content_type_id=content_type_id,
+            object_id=object_id,
+            user_id=user_id,
+            viewer_ip=viewer_ip,
+            last_viewed=last_viewed,
+            created_at=now,
+            updated_at=now,
+        )
+        # NULLs never conflict in a unique index, so these rows cannot be upserted
+        (with_nulls if user_id is None or viewer_ip is None else rows).append(view)
+
+    written = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            with transaction.atomic():
+                ContentView.objects.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=["content_type", "object_id", "user", "viewer_ip"],
+                    update_fields=["last_viewed", "updated_at"],
+                )
+            written += len(batch)
+        except (DatabaseError, ValidationError, ValueError) as e:
+            logger.error(f"Could not write a batch of {len(batch)} buffered views, writing them one by one: {str(e)}")
+            written += _write_views_one_by_one(batch, now)
+    return written + _write_views_one_by_one(with_nulls, now)
+
+
+def flush_view_buffer(batch_size: Optional[int] = None) -> int:
+    """
+    Write all buffered views to ContentView, unless another flush is running.
+
+    The lock's timeout must outlast a flush: once it expires, a second
+    flush can claim the same hashes.
+
+    Returns:
+        int: The number of (object, viewer) pairs written
+    """
+    batch_size = batch_size or getattr(settings, "CONTENT_VIEW_FLUSH_BATCH_SIZE", 500)
+    redis = get_view_buffer_redis()
+    lock = redis.lock(FLUSH_LOCK_KEY, timeout=getattr(settings, "CONTENT_VIEW_FLUSH_LOCK_TIMEOUT", 600))
+    if not lock.acquire(blocking=False):
+        logger.info("Another flush of buffered content views is running, skipping this one")
+        return 0
+    try:
+        return _flush_claimed_batches(redis, batch_size)
+    finally:
+        try:
+            lock.release()
+        except LockError as e:
+            logger.error(f"Content view flush outlasted its lock: {str(e)}")
+
+
+def _flush_claimed_batches(redis: Any, batch_size: int) -> int:
+    keys = _claim_batches()
+
+    # Merge all claimed hashes, keeping the latest view of each pair
+    views: Dict[ViewKey, datetime] = {}
+    for key in keys:
+        for field, value in redis.hgetall(key).items():
+            try:
+                view_key = decode_view_key(field)
+                last_viewed = datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+            except (ValueError, OverflowError) as e:
+                logger.error(f"Dropping buffered view: {str(e)}")
+                continue
+            if view_key not in views or views[view_key] < last_viewed:
+                views[view_key] = last_viewed
+
+    written = 0
+    if views:
+        _drop_missing_references(views)
+        written = _upsert_views(views, batch_size)
+    if keys:
+        redis.delete(*keys)
+    return written
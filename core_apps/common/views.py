@@ -0,0 +1,88 @@
+import uuid
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.translation import gettext_lazy as _
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .instrumentation import slow_request_log
+from .models import ContentViewDaily
+from .permissions import IsAdministrator
+from .renderers import GenericJSONRenderer
+
+class SlowRequestListView(APIView):
+    """
+    Lists the sampled slow requests, newest first. Administrators only.
+
+    Query params:
+        limit: Maximum number of entries to return (defaults to the buffer size)
+    """
+    permission_classes = [IsAdministrator]
+    renderer_classes = [GenericJSONRenderer]
+    object_label = "slow_requests"
+
+    def get(self, request: Request) -> Response:
+        try:
+            limit = int(request.query_params.get("limit", 0)) or None
+        except ValueError:
+            return Response({"error": _("limit must be an integer")}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            entries = slow_request_log.entries(limit)
+        except RedisError:
+            return Response({"error": _("Slow request log is unavailable")}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(entries)
+
+    def delete(self, request: Request) -> Response:
+        slow_request_log.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class ContentViewStatsView(APIView):
+    """
+    Daily viewer counts from the ContentViewDaily rollups. Administrators only.
+
+    Query params:
+        content_type: "app_label.model" of the viewed objects (optional)
+        object_id: A single object to report on (optional)
+        start, end: ISO dates bounding the period (defaults to the last 30 days)
+    """
+    permission_classes = [IsAdministrator]
+    renderer_classes = [GenericJSONRenderer]
+    object_label = "content_views"
+
+    def get(self, request: Request) -> Response:
+        params = request.query_params
+        try:
+            end = parse_date(params["end"]) if "end" in params else timezone.localdate()
+            start = parse_date(params["start"]) if "start" in params else end - timedelta(days=29)
+        except (TypeError, ValueError):
+            start = end = None
+        if start is None or end is None:
+            return Response({"error": _("start and end must be dates (YYYY-MM-DD)")}, status=status.HTTP_400_BAD_REQUEST)
+
+        rollups = ContentViewDaily.objects.filter(day__range=(start, end))
+        if "content_type" in params:
+            app_label, _dot, model = params["content_type"].partition(".")
+            try:
+                content_type = ContentType.objects.get_by_natural_key(app_label, model.lower())
+            except ContentType.DoesNotExist:
+                return Response({"error": _("Unknown content type")}, status=status.HTTP_400_BAD_REQUEST)
+            rollups = rollups.filter(content_type=content_type)
+        if "object_id" in params:
+            try:
+                rollups = rollups.filter(object_id=uuid.UUID(params["object_id"]))
+            except ValueError:
+                return Response({"error": _("object_id must be a UUID")}, status=status.HTTP_400_BAD_REQUEST)
+
+        days = (
+            rollups.order_by("day")
+            .values("day")
+            .annotate(viewers=Sum("viewers"), authenticated_viewers=Sum("authenticated_viewers"))
+        )
+        return Response(list(days))
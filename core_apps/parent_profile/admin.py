@@ -3,6 +3,7 @@ from cloudinary.forms import CloudinaryFileField
 from django import forms
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
+from core_apps.common.media_storage import media_url
 from .models import Profile
 
 class ProfileAdminForm(forms.ModelForm):
@@ -124,10 +125,12 @@ class ProfileAdmin(admin.ModelAdmin):
     email.short_description = _("Email")
 
     def photo_preview(self, obj) -> str:
-        if obj.photo:
+        # The thumbnail variant is already 200x200; the original is the fallback
+        url = obj.photo_thumb_url or obj.photo_url or media_url(obj.photo)
+        if url:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit: cover;" />',
-                obj.photo.url,
+                url,
             )
         return "No photo"
 
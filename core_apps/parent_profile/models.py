@@ -116,6 +116,13 @@ class Profile(TimestampedModel):
     photo_url = models.URLField(_("Photo URL"), blank=True, null=True)
     id_photo = CloudinaryField(_("ID Photo"), blank=True, null=True)
     id_photo_url = models.URLField(_("ID Photo URL"), blank=True, null=True)
+    # Resized variants of the photos (see common.images), served by list views and the admin
+    photo_thumb_url = models.URLField(_("Photo Thumbnail URL"), blank=True, null=True)
+    photo_list_url = models.URLField(_("Photo List URL"), blank=True, null=True)
+    photo_full_url = models.URLField(_("Photo Full URL"), blank=True, null=True)
+    id_photo_thumb_url = models.URLField(_("ID Photo Thumbnail URL"), blank=True, null=True)
+    id_photo_list_url = models.URLField(_("ID Photo List URL"), blank=True, null=True)
+    id_photo_full_url = models.URLField(_("ID Photo Full URL"), blank=True, null=True)
     
     # Future feature: Digital Signature
     # signature_photo = CloudinaryField(_("Signature Photo"), blank=True, null=True)
@@ -1,18 +1,18 @@
-import base64
+from functools import partial
 from typing import Any, Dict
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.contenttypes.models import ContentType
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
+from django.db import transaction
 from django_countries.serializers_fields import CountryField
 from phonenumber_field.serializerfields import PhoneNumberField
 from rest_framework import serializers
 
-from core_apps.common.models import ContentView
+from core_apps.common.instrumentation import TimedSerializerMixin
+from core_apps.common.media_storage import media_url
+from core_apps.common.unique_viewers import UniqueViewerListSerializer, unique_viewer_count
+from core_apps.common.uploads import stage_upload
 from .models import Profile
-from .tasks import upload_profile_picture
+from .tasks import store_profile_photos
 
 User = get_user_model()
 
@@ -20,12 +20,13 @@ class UUIDField(serializers.Field):
     def to_representation(self, value: str) -> str:
         return str(value)
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = UUIDField(read_only=True)
     first_name = serializers.CharField(source="user.first_name")
     middle_name = serializers.CharField(source="user.middle_name", required=False, allow_blank=True)
     last_name = serializers.CharField(source="user.last_name")
     username = serializers.ReadOnlyField(source="user.username")
+    slug = serializers.ReadOnlyField(source="user.slug")
     email = serializers.EmailField(source="user.email", read_only=True)
     full_name = serializers.ReadOnlyField(source="user.full_name")
     id_no = serializers.ReadOnlyField(source="user.id_no")
@@ -38,10 +39,14 @@ class ProfileSerializer(serializers.ModelSerializer):
 
     photo_url = serializers.URLField(read_only=True)
     id_photo_url = serializers.URLField(read_only=True)
+    photo_thumb_url = serializers.URLField(read_only=True)
+    photo_list_url = serializers.URLField(read_only=True)
+    photo_full_url = serializers.URLField(read_only=True)
     view_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
+        list_serializer_class = UniqueViewerListSerializer
         fields = [
             "id",
             "first_name",
@@ -62,6 +67,9 @@ class ProfileSerializer(serializers.ModelSerializer):
             "id_photo",
             "photo_url",
             "id_photo_url",
+            "photo_thumb_url",
+            "photo_list_url",
+            "photo_full_url",
             "created_at",
             "updated_at",
             "view_count",
@@ -92,17 +100,8 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         for field in ["photo", "id_photo"]:
             if field in validated_data:
-                photos_to_upload[field] = validated_data.pop(field)
-                if photo.size > settings.MAX_UPLOAD_SIZE:
-                    temp_file = default_storage.save(
-                        f"temp_{instance.id}_{field}.jpg", ContentFile(photo.read())
-                    )
-                    temp_file_path = default_storage.path(temp_file)
-                    photos_to_upload[field] = {"type": "file", "path": temp_file_path}
-                else:
-                    image_content = photo.read()
-                    encoded_image = base64.b64encode(image_content).decode("utf-8")
-                    photos_to_upload[field] = {"type": "base64", "data": encoded_image}
+                photo = validated_data.pop(field)
+                photos_to_upload[field] = stage_upload(photo, prefix=f"{instance.id}_{field}_")
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -110,22 +109,30 @@ class ProfileSerializer(serializers.ModelSerializer):
         instance.save()
 
         if photos_to_upload:
-            upload_photos_to_cloudinary.delay(str(instance.id), photos_to_upload)
+            transaction.on_commit(
+                partial(store_profile_photos.delay, str(instance.id), photos_to_upload)
+            )
 
         return instance
     
     def get_view_count(self, obj: Profile) -> int:
-        content_type = ContentType.objects.get_for_model(obj)
-        return ContentView.objects.filter(content_type=content_type, object_id=obj.id).count()
+        # Lists set view_count for all their profiles (UniqueViewerListSerializer)
+        view_count = getattr(obj, "view_count", None)
+        if view_count is not None:
+            return view_count
+        return unique_viewer_count(obj)
 
-class ProfileListSerializer(serializers.ModelSerializer):
+class ProfileListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField(source="user.full_name")
     username = serializers.ReadOnlyField(source="user.username")
     email = serializers.EmailField(source="user.email", read_only=True)
-    photo = serializers.ImageField(read_only=True)
+    photo = serializers.SerializerMethodField()
+    view_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
+        # Fetches the view counts of a whole page in one round trip
+        list_serializer_class = UniqueViewerListSerializer
         fields = [
             "full_name",
             "username",
@@ -134,11 +141,16 @@ class ProfileListSerializer(serializers.ModelSerializer):
             "country_of_birth",
             "email",
             "phone_number",
-            "photo"
+            "photo",
+            "view_count",
         ]
 
     def get_photo(self, obj: Profile) -> str:
-        try:
-            return obj.photo.url
-        except AttributeError:
-            return None
\ No newline at end of file
+        # Prefer the list-sized variant over the full-size original
+        return obj.photo_list_url or obj.photo_url or media_url(obj.photo)
+
+    def get_view_count(self, obj: Profile) -> int:
+        view_count = getattr(obj, "view_count", None)
+        if view_count is not None:
+            return view_count
+        return unique_viewer_count(obj)
@@ -0,0 +1,21 @@
+from typing import Any, Dict
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core_apps.common.testing import ProfileListQueryTestMixin
+from .models import Profile
+from .views import ProfileViewSet
+
+User = get_user_model()
+
+
+class ProfileListQueryTests(ProfileListQueryTestMixin, TestCase):
+    profile_model = Profile
+    view_class = ProfileViewSet
+    role = User.RoleChoices.PARENT
+    path = "/api/v1/parent/parent-profiles/"
+    list_queries = 2
+
+    def profile_fields(self, index: int) -> Dict[str, Any]:
+        return {"slug": f"parent-{index}"}
@@ -1,20 +1,20 @@
 from typing import Any, List
 
-from django.contrib.contenttypes.models import ContentType
 from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, filters,generics
+from rest_framework import status, generics
 from rest_framework import serializers
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import FormParser, MultiPartParser, JSONParser
 from rest_framework.response import Response
 from rest_framework.request import Request
 
-from core_apps.common.models import ContentView
+from core_apps.common.mixins import QueryBudgetMixin, StreamingListMixin
 from core_apps.common.permissions import *
 from core_apps.common.renderers import GenericJSONRenderer
+from core_apps.common.search import UserSearchFilter
+from core_apps.common.view_buffer import buffer_view
 from .models import Profile
 from .serializers import ProfileSerializer, ProfileListSerializer
 
@@ -23,19 +23,30 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class ProfileViewSet(generics.ListCreateAPIView):
+class ProfileViewSet(QueryBudgetMixin, StreamingListMixin, generics.ListCreateAPIView):
     serializer_class = ProfileSerializer
     renderer_classes = [GenericJSONRenderer]
     pagination_class = StandardResultsSetPagination
     object_label = "profiles"
+    # Lists only: count and page queries, plus the user lookup on an auth cache miss
+    query_budget = {"GET": 3}
     permission_classes = [IsParent]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, UserSearchFilter]
     search_fields = ['user__first_name', 'user__last_name', 'user__id_no']
+    search_user_field = "user"
     filterset_fields = ['user__first_name', 'user__last_name', 'user__id_no']
 
+    def get_serializer_class(self) -> type:
+        # Lists render the lighter ProfileListSerializer
+        if self.request.method == "GET":
+            return ProfileListSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self)-> List[Profile]:
-        return Profile.objects.exclude(user__is_staff=True).exclude(
-            user__is_superuser=True
+        return (
+            Profile.objects.exclude(user__is_staff=True)
+            .exclude(user__is_superuser=True)
+            .select_related("user")
         )
 
 class ProfileDetailViewSet(generics.RetrieveUpdateAPIView):
@@ -46,26 +57,15 @@ class ProfileDetailViewSet(generics.RetrieveUpdateAPIView):
     
     def get_object(self)-> Profile:
         try:
-            profile = Profile.objects.get(user=self.request.user)
+            profile = Profile.objects.select_related("user").get(user=self.request.user)
             self.record_profile_view(profile)
             return profile
         except Profile.DoesNotExist:
             raise Http404("Profile not found")
     
     def record_profile_view(self, profile: Profile) -> None:
-        content_type = ContentType.objects.get_for_model(profile)
-        viewer_ip = self.get_client_ip()
-        user = self.request.user
-
-        obj, created = ContentView.objects.update_or_create(
-            content_type=content_type,
-            object_id=profile.id,
-            user=user,
-            viewer_ip=viewer_ip,
-            defaults={
-                "last_viewed": timezone.now(),
-            }
-        )
+        # Buffered in Redis and written to ContentView by flush_content_views
+        buffer_view(profile, self.request.user, self.get_client_ip())
 
     def get_client_ip(self) -> str:
         x_forwarded_for = self.request.META.get('HTTP_X_FORWARDED_FOR')
@@ -1,21 +1,38 @@
+from typing import Any, Dict, Iterable
+
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
-from loguru import logger
+
+from core_apps.common.emails import queue_templated_email, queue_templated_emails
+
+def account_created_context(user) -> Dict[str, Any]:
+    """Build the JSON-serializable template context for the account created email."""
+    return {
+        "user": {
+            "full_name": user.full_name,
+            "username": user.username,
+            "security_question": user.security_question,
+            "security_answer": user.security_answer,
+        },
+        "site_name": settings.SITE_NAME,
+    }
 
 def send_account_created_email(user):
     subject = _('Account created successfully')
-    from_email = settings.DEFAULT_FROM_EMAIL
     recepient_list = [user.email]
-    context = {"user": user, "site_name": settings.SITE_NAME,}
-    html_email = render_to_string("emails/account_created.html", context)
-    plain_email = strip_tags(html_email)
-    email = EmailMultiAlternatives(subject, plain_email, from_email, recepient_list)
-    email.attach_alternative(html_email, "text/html")
-    try:
-        email.send()
-        logger.info(f"Account created email sent to {user.email}")
-    except Exception as e:
-        logger.error(f"Failed to send account created email to {email}: Error: {str(e)}")
\ No newline at end of file
+    queue_templated_email(
+        subject,
+        "emails/account_created.html",
+        recepient_list,
+        account_created_context(user),
+        dedup_key=f"account-created:{user.pk}",
+    )
+
+def send_account_created_emails(users: Iterable[Any]) -> int:
+    """Queue account created emails for many users, rendered in batches by the workers."""
+    subject = _('Account created successfully')
+    return queue_templated_emails(
+        subject,
+        "emails/account_created.html",
+        (([user.email], account_created_context(user)) for user in users),
+    )
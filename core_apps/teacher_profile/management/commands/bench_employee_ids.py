@@ -0,0 +1,42 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core_apps.teacher_profile.utils import (
+    calculate_luhn_check_digit,
+    generate_teacher_empId,
+    generate_teacher_empIds,
+)
+
+class Command(BaseCommand):
+    help = "Compare one-at-a-time and batched employee-ID generation."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10_000, help="Employee IDs generated per run")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per strategy; the fastest is reported")
+
+    def best_of(self, repeat: int, func) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        count, repeat = options["count"], options["repeat"]
+        if count < 1 or repeat < 1:
+            raise CommandError("--count and --repeat must be positive")
+
+        empIds = generate_teacher_empIds(count)
+        invalid = [empId for empId in empIds if int(empId[-1]) != calculate_luhn_check_digit(empId[:-1])]
+        if invalid:
+            raise CommandError(f"Batch check digits disagree with the scalar Luhn for {len(invalid)} IDs, e.g. {invalid[0]}")
+
+        scalar = self.best_of(repeat, lambda: [generate_teacher_empId() for _ in range(count)])
+        batch = self.best_of(repeat, lambda: generate_teacher_empIds(count))
+
+        self.stdout.write(f"scalar: {scalar:.4f}s ({count / scalar:,.0f} IDs/s)")
+        self.stdout.write(f"batch:  {batch:.4f}s ({count / batch:,.0f} IDs/s)")
+        self.stdout.write(self.style.SUCCESS(f"Batch generation is {scalar / batch:.1f}x faster; check digits match"))
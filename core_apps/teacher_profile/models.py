@@ -87,6 +87,8 @@ class Profile(TimestampedModel):
 
     # Employment Information
     designation = models.CharField(_("Designation"),max_length=255, blank=True, null=True)
+    # School-issued employee ID with a Luhn check digit, issued by onboard_users (see utils.issue_teacher_empIds)
+    employee_id = models.CharField(_("Employee ID"), max_length=12, unique=True, blank=True, null=True)
     # User's salary
     salary = models.IntegerField(_("Salary"), blank=True, null=True)
     unpaid_salary = models.DecimalField(_("Unpaid Salary"), max_digits=10, decimal_places=2, default=0)
@@ -122,6 +124,13 @@ class Profile(TimestampedModel):
     photo_url = models.URLField(_("Photo URL"), blank=True, null=True)
     id_photo = CloudinaryField(_("ID Photo"), blank=True, null=True)
     id_photo_url = models.URLField(_("ID Photo URL"), blank=True, null=True)
+    # Resized variants of the photos (see common.images), served by list views and the admin
+    photo_thumb_url = models.URLField(_("Photo Thumbnail URL"), blank=True, null=True)
+    photo_list_url = models.URLField(_("Photo List URL"), blank=True, null=True)
+    photo_full_url = models.URLField(_("Photo Full URL"), blank=True, null=True)
+    id_photo_thumb_url = models.URLField(_("ID Photo Thumbnail URL"), blank=True, null=True)
+    id_photo_list_url = models.URLField(_("ID Photo List URL"), blank=True, null=True)
+    id_photo_full_url = models.URLField(_("ID Photo Full URL"), blank=True, null=True)
     
     # Future feature: Digital Signature
     # signature_photo = CloudinaryField(_("Signature Photo"), blank=True, null=True)
@@ -0,0 +1,16 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core_apps.common.testing import ProfileListQueryTestMixin
+from .models import Profile
+from .views import ProfileViewSet
+
+User = get_user_model()
+
+
+class ProfileListQueryTests(ProfileListQueryTestMixin, TestCase):
+    profile_model = Profile
+    view_class = ProfileViewSet
+    role = User.RoleChoices.TEACHER
+    path = "/api/v1/teacher/teacher-profiles/"
+    list_queries = 2
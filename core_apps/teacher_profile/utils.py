@@ -1,19 +1,28 @@
 import secrets
+from functools import lru_cache
 from os import getenv
-from typing import Union, List
-from django.db import transaction
-from .emails import send_account_creation_email
+from typing import Union, List, Sequence, Tuple
+from django.db import IntegrityError, transaction
 
-from .models import Teacher
+from .models import Profile
 
-def generate_teacher_empId():
-    """Generate a unique employee ID for a teacher"""
+# Digit sum of 2 * d for each digit d, as used by the Luhn algorithm
+LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+# Number of digits looked up at once by the batch Luhn computation
+LUHN_CHUNK_WIDTH = 3
+EMPLOYEE_ID_LENGTH = 12
+
+def get_empId_prefix() -> str:
+    """Return the school code and location code every employee ID starts with."""
     school_code = getenv("SCHOOL_CODE")
     school_location = getenv("SCHOOL_LOCATION_CODE")
+    return f"{school_code}{school_location}"
 
-    prefix = f"{school_code}{school_location}"
+def generate_teacher_empId():
+    """Generate a unique employee ID for a teacher"""
+    prefix = get_empId_prefix()
 
-    remaining_length = 12 - len(prefix) - 1
+    remaining_length = EMPLOYEE_ID_LENGTH - len(prefix) - 1
 
     random_digits = "".join(
         secrets.choice("0123456789") for _ in range(remaining_length)
@@ -37,4 +46,108 @@ def calculate_luhn_check_digit(number: str) -> int:
         doubled = d * 2
         total += sum(split_into_digits(doubled))
 
-    return (10 - (total % 10)) % 10
\ No newline at end of file
+    return (10 - (total % 10)) % 10
+
+def luhn_weighted_sum(digits: str, offset: int = 0) -> int:
+    """
+    Luhn sum of `digits` when its rightmost digit sits `offset` places from
+    the right of the full number: digits at even positions count as-is,
+    digits at odd positions are doubled.
+    """
+    return sum(
+        LUHN_DOUBLED[int(digit)] if (offset + position) % 2 else int(digit)
+        for position, digit in enumerate(reversed(digits))
+    )
+
+@lru_cache(maxsize=None)
+def luhn_chunk_tables() -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Precomputed Luhn sums for every LUHN_CHUNK_WIDTH-digit block, one table
+    for blocks starting at an even position and one for an odd position.
+    """
+    blocks = [f"{value:0{LUHN_CHUNK_WIDTH}d}" for value in range(10 ** LUHN_CHUNK_WIDTH)]
+    return (
+        tuple(luhn_weighted_sum(block, 0) for block in blocks),
+        tuple(luhn_weighted_sum(block, 1) for block in blocks),
+    )
+
+def calculate_luhn_check_digits(prefix: str, numbers: Sequence[int], width: int) -> List[int]:
+    """
+    Compute the check digits of `prefix` + each zero-padded number at once.
+
+    Produces the same digits as calculate_luhn_check_digit, but the prefix is
+    summed once for the whole batch and each number is summed from table
+    lookups of LUHN_CHUNK_WIDTH digits instead of per-digit list building.
+    """
+    prefix_total = luhn_weighted_sum(prefix, width)
+    tables = luhn_chunk_tables()
+    modulus = 10 ** LUHN_CHUNK_WIDTH
+    offsets = range(0, width, LUHN_CHUNK_WIDTH)
+    check_digits = []
+    for number in numbers:
+        total = prefix_total
+        for offset in offsets:
+            number, block = divmod(number, modulus)
+            total += tables[offset % 2][block]
+        check_digits.append((10 - (total % 10)) % 10)
+    return check_digits
+
+def generate_teacher_empIds(count: int) -> List[str]:
+    """
+    Generate `count` distinct employee IDs in one batch.
+
+    Raises:
+        ValueError: If `count` is larger than the number of possible IDs
+    """
+    prefix = get_empId_prefix()
+    width = EMPLOYEE_ID_LENGTH - len(prefix) - 1
+    upper = 10 ** width
+    if count > upper:
+        raise ValueError(f"Cannot generate {count} distinct employee IDs; prefix {prefix} leaves only {upper}")
+
+    numbers = set()
+    while len(numbers) < count:
+        numbers.add(secrets.randbelow(upper))
+    numbers = list(numbers)
+
+    check_digits = calculate_luhn_check_digits(prefix, numbers, width)
+    return [
+        f"{prefix}{number:0{width}d}{check_digit}"
+        for number, check_digit in zip(numbers, check_digits)
+    ]
+
+def issue_teacher_empIds(profiles: Sequence[Profile], max_attempts: int = 5) -> List[Profile]:
+    """
+    Give every profile without an employee ID a new, unique one.
+
+    Candidates are generated in a batch and checked against existing IDs with
+    one query. The chosen IDs are then written with a single bulk UPDATE in a
+    transaction; the unique index on employee_id makes the reservation atomic,
+    and a batch that loses a race with a concurrent issuer is retried.
+
+    Returns:
+        List[Profile]: The profiles that were assigned an ID
+    """
+    pending = [profile for profile in profiles if not profile.employee_id]
+    issued = []
+    for _ in range(max_attempts):
+        if not pending:
+            break
+        candidates = generate_teacher_empIds(len(pending))
+        taken = set(
+            Profile.objects.filter(employee_id__in=candidates).values_list("employee_id", flat=True)
+        )
+        batch = []
+        for profile, empId in zip(pending, (c for c in candidates if c not in taken)):
+            profile.employee_id = empId
+            batch.append(profile)
+        try:
+            with transaction.atomic():
+                Profile.objects.bulk_update(batch, ["employee_id"])
+        except IntegrityError:
+            for profile in batch:
+                profile.employee_id = None
+            continue
+        issued.extend(batch)
+        pending = pending[len(batch):]
+    return issued
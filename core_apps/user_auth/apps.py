@@ -5,3 +5,9 @@ class UserAuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core_apps.user_auth'
     verbose_name = _("User Auth")
+
+    def ready(self) -> None:
+        """
+        Automatically import signals when the app is ready.
+        """
+        import core_apps.user_auth.signals
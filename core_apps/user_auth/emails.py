@@ -1,78 +1,75 @@
 # Django imports for email handling and configuration
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.utils.crypto import salted_hmac
 from django.utils.translation import gettext_lazy as _
-from loguru import logger
+
+from core_apps.common.emails import queue_templated_email
 
 def send_otp_email(email, otp):
     """
-    Send a One-Time Password (OTP) email to the user for verification.
-    
+    Queue a One-Time Password (OTP) email to the user for verification.
+
     Args:
         email (str): The recipient's email address
         otp (str): The generated OTP to be sent
-        
+
     The email includes:
         - The OTP code
         - Expiry time information
         - Site name for branding
-        
-    Both HTML and plain text versions of the email are sent.
-    Logs success or failure of email sending operation.
+
+    Rendering and SMTP delivery happen in a Celery worker, so the login
+    request does not wait on the mail server. The same code is never queued
+    twice for the same address.
     """
     subject = _("Please verify your login")
-    from_email = settings.DEFAULT_FROM_EMAIL
     recepient_list = [email]
     # Prepare context data for email template
     context = {
         "otp": otp,
-        "expiry_time": settings.OTP_EXPIRY_TIME,
+        "otp_duration": int(settings.OTP_EXPIRY_TIME.total_seconds() // 60),
         "site_name": settings.SITE_NAME,
     }
-    # Render both HTML and plain text versions
-    html_email = render_to_string("emails/otp_email.html", context)
-    plain_email = strip_tags(html_email)
-    email = EmailMultiAlternatives(subject, plain_email, from_email, recepient_list)
-    email.attach_alternative(html_email, "text/html")
-    try:
-        email.send()
-        logger.info("OTP sent to %s", email)
-    except Exception as e:
-        logger.error(f"Failed to send OTP to {email}: Error: {str(e)}", exc_info=True)
+    # Keyed HMAC, so neither the address nor the live code ends up in a
+    # cache key or log line, and the code cannot be brute-forced from it
+    dedup_digest = salted_hmac("otp-email-dedup", f"{email.strip().lower()}:{otp}").hexdigest()
+    queue_templated_email(
+        subject,
+        "emails/otp_email.html",
+        recepient_list,
+        context,
+        dedup_key=f"otp:{dedup_digest}",
+        dedup_timeout=settings.OTP_EXPIRY_TIME,
+    )
 
 def send_account_locked_email(self):
     """
-    Send an email notification when a user's account is locked due to multiple failed login attempts.
-    
+    Queue an email notification when a user's account is locked due to multiple failed login attempts.
+
     Args:
         self: The user instance whose account is locked
-        
+
     The email includes:
         - User's full name
         - Account lockout duration
         - Site name for branding
-        
-    Both HTML and plain text versions of the email are sent.
-    Logs success or failure of email sending operation.
+
+    Rendering and SMTP delivery happen in a Celery worker. At most one
+    notification is queued per user for each lockout period.
     """
     subject = _("Account Locked")
-    from_email = settings.DEFAULT_FROM_EMAIL
     recepient_list = [self.email]
     # Prepare context data for email template
     context = {
-        "user": self,
+        "user": {"full_name": self.full_name},
         "lockout_duration": int(settings.LOCKOUT_DURATION.total_seconds() // 60),
         "site_name": settings.SITE_NAME,
     }
-    # Render both HTML and plain text versions
-    html_email = render_to_string("emails/account_locked.html", context)
-    plain_email = strip_tags(html_email)
-    email = EmailMultiAlternatives(subject, plain_email, from_email, recepient_list)
-    email.attach_alternative(html_email, "text/html")
-    try:
-        email.send()
-        logger.info("Account locked email sent to %s", self.email)
-    except Exception as e:
-        logger.error(f"Failed to send account locked email to {self.email}: Error: {str(e)}", exc_info=True)
\ No newline at end of file
+    queue_templated_email(
+        subject,
+        "emails/account_locked.html",
+        recepient_list,
+        context,
+        dedup_key=f"account-locked:{self.pk}",
+        dedup_timeout=settings.LOCKOUT_DURATION,
+    )
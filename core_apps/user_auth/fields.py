@@ -0,0 +1,28 @@
+from typing import Any, Optional
+
+from autoslug import AutoSlugField
+
+
+class ChangeAwareAutoSlugField(AutoSlugField):
+    """
+    AutoSlugField that only recomputes the slug when its source has changed.
+
+    With always_update=True, AutoSlugField re-slugifies `populate_from` and
+    probes the table for a unique slug on every save. This field keeps the
+    stored slug instead, unless the instance is new, has no slug yet, or
+    reports through `has_field_changed(populate_from)` that the source field
+    was modified since it was loaded.
+    """
+
+    def pre_save(self, instance: Any, add: bool) -> Optional[str]:
+        value = self.value_from_object(instance)
+        has_field_changed = getattr(instance, "has_field_changed", None)
+        if (
+            not add
+            and value
+            and isinstance(self.populate_from, str)
+            and has_field_changed is not None
+            and not has_field_changed(self.populate_from)
+        ):
+            return value
+        return super().pre_save(instance, add)
@@ -0,0 +1,149 @@
+"""
+Failed-login tracking for the login endpoint.
+
+Failures are counted with atomic increments in the cache, inside a sliding
+window that restarts on every failed attempt. The users table is only written
+when the counter crosses settings.LOGIN_ATTEMPTS and the account switches to
+LOCKED, and that write is a conditional UPDATE so parallel attempts lock the
+account (and send the notification email) exactly once.
+
+A lock ends settings.LOCKOUT_DURATION after the last failed login. Reads
+compute that from the row (see lockout_cutoff and User.is_locked_out) without
+writing; the unlock_expired_accounts task later resets expired locks in bulk.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils import timezone
+
+from core_apps.common.user_cache import invalidate_cached_user, invalidate_cached_users
+
+from .emails import send_account_locked_email
+
+
+def get_lockout_cache():
+    """Return the cache that holds the failed-login counters."""
+    return caches[getattr(settings, "LOCKOUT_CACHE_ALIAS", "default")]
+
+
+def failure_key(user_id: Any) -> str:
+    """Build the cache key for a user's failed-login counter."""
+    return f"login-failures:{user_id}"
+
+
+def get_failure_window() -> int:
+    """Return the sliding window, in seconds, over which failures are counted."""
+    window = getattr(settings, "FAILED_LOGIN_WINDOW", settings.LOCKOUT_DURATION)
+    return int(window.total_seconds())
+
+
+def lockout_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Return the time before which a last failed login no longer locks the account."""
+    return (now or timezone.now()) - settings.LOCKOUT_DURATION
+
+
+def locked_out_q(now: Optional[datetime] = None) -> Q:
+    """
+    Filter for accounts whose lock is still in effect.
+
+    LOCKED accounts without a last failed login (locked by hand) stay locked.
+    """
+    return Q(account_status="LOCKED") & (
+        Q(last_failed_login__isnull=True) | Q(last_failed_login__gt=lockout_cutoff(now))
+    )
+
+
+def register_failed_login(user: Any) -> int:
+    """
+    Count a failed login for the user and lock the account at the threshold.
+
+    Args:
+        user: The user whose credentials were rejected
+
+    Returns:
+        int: The number of failures inside the current window
+    """
+    cache = get_lockout_cache()
+    key = failure_key(user.pk)
+    window = get_failure_window()
+
+    cache.add(key, 0, timeout=window)
+    try:
+        attempts = cache.incr(key)
+    except ValueError:
+        # The counter expired between add() and incr().
+        cache.set(key, 1, timeout=window)
+        attempts = 1
+    cache.touch(key, timeout=window)
+
+    if attempts >= settings.LOGIN_ATTEMPTS:
+        now = timezone.now()
+        locked = (
+            type(user).objects.filter(pk=user.pk)
+            .exclude(locked_out_q(now))
+            .update(
+                account_status=user.AccountStatus.LOCKED,
+                failed_login_attempts=attempts,
+                last_failed_login=now,
+            )
+        )
+        if locked:
+            # Start counting afresh once the lock expires; a counter kept
+            # for a FAILED_LOGIN_WINDOW longer than LOCKOUT_DURATION would
+            # otherwise re-lock the account on the next wrong password
+            cache.delete(key)
+            invalidate_cached_user(user.pk)
+            user.account_status = user.AccountStatus.LOCKED
+            user.last_failed_login = now
+            send_account_locked_email(user)
+
+    return attempts
+
+
+def clear_failed_logins(user: Any) -> None:
+    """Drop the user's failed-login counter after a successful login."""
+    get_lockout_cache().delete(failure_key(user.pk))
+
+
+def unlock_expired_accounts(now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """
+    Reactivate every LOCKED account whose lockout period has passed.
+
+    Each batch is one UPDATE that re-checks the expiry, so an account locked
+    again in the meantime is left alone. Cached users and failure counters
+    of the unlocked accounts are dropped.
+
+    Args:
+        now: The reference time (defaults to timezone.now())
+        batch_size: Accounts unlocked per UPDATE
+
+    Returns:
+        int: The number of accounts unlocked
+    """
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    cutoff = lockout_cutoff(now)
+    expired = User.objects.filter(
+        account_status=User.AccountStatus.LOCKED, last_failed_login__lte=cutoff
+    )
+
+    unlocked = 0
+    while True:
+        pks: List[Any] = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        unlocked += expired.filter(pk__in=pks).update(
+            account_status=User.AccountStatus.ACTIVE,
+            failed_login_attempts=0,
+            last_failed_login=None,
+        )
+        invalidate_cached_users(pks)
+        get_lockout_cache().delete_many([failure_key(pk) for pk in pks])
+        if len(pks) < batch_size:
+            break
+    return unlocked
@@ -0,0 +1,73 @@
+import time
+from typing import Any, List
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core_apps.common.query_count import QueryCounter
+
+User = get_user_model()
+
+class Rollback(Exception):
+    """Raised to discard the benchmark users."""
+
+class Command(BaseCommand):
+    help = (
+        "Measure User.save() throughput with the slug recomputed on every save "
+        "(the old always_update behaviour) and with username change tracking. "
+        "Runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200, help="Users created for the run")
+        parser.add_argument("--saves", type=int, default=5, help="Saves per user per strategy")
+
+    def create_users(self, count: int) -> List[Any]:
+        users = []
+        for i in range(count):
+            user = User(
+                username=f"BENCH-{i:08d}",
+                email=f"bench-save-{i}@example.com",
+                first_name="Bench",
+                last_name=f"User{i}",
+                id_no=2_000_000_000 - i,
+                security_question=User.SecurityQuestions.BIRTH_CITY,
+                security_answer="bench",
+            )
+            user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users)
+        return list(User.objects.filter(username__startswith="BENCH-"))
+
+    def run(self, users: List[Any], saves: int, track_changes: bool) -> tuple:
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            for round_no in range(saves):
+                for user in users:
+                    # A real change on every save, so each one is written
+                    user.first_name = f"Bench{round_no}"
+                    if not track_changes:
+                        # Forget the loaded values: every column and the slug are written, as before
+                        user._loaded_values = {}
+                    user.save()
+        elapsed = time.perf_counter() - started
+        return elapsed, counter.count
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["users"] < 1 or options["saves"] < 1:
+            raise CommandError("--users and --saves must be positive")
+
+        try:
+            with transaction.atomic():
+                users = self.create_users(options["users"])
+                total = len(users) * options["saves"]
+                for label, track_changes in (("always recompute", False), ("change-tracked", True)):
+                    elapsed, queries = self.run(users, options["saves"], track_changes)
+                    self.stdout.write(
+                        f"{label:>16}: {total / elapsed:,.0f} saves/s, {queries / total:.1f} queries/save"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,119 @@
+import math
+import random
+import statistics
+import time
+from functools import reduce
+from operator import and_, or_
+from typing import Any, Callable, Dict, List
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+
+from core_apps.common.search import search_users
+
+User = get_user_model()
+
+FIRST_NAMES = [
+    "Aarav", "Abigail", "Adrian", "Aisha", "Alice", "Amelia", "Ananya", "Arjun", "Benjamin", "Chloe",
+    "Daniel", "Diya", "Elena", "Ethan", "Fatima", "Gabriel", "Grace", "Hannah", "Isaac", "Ishaan",
+    "Jacob", "Jithin", "Kavya", "Leah", "Liam", "Lucas", "Maria", "Meera", "Mohammed", "Noah",
+    "Olivia", "Priya", "Rahul", "Rohan", "Sara", "Sophia", "Thomas", "Vivek", "William", "Zara",
+]
+SYLLABLES = ["an", "bel", "car", "dra", "el", "fen", "gar", "hol", "ik", "jos", "kar", "lin", "mor",
+             "nath", "ol", "pra", "quin", "ros", "sen", "tor", "ul", "var", "wes", "yan", "zel"]
+
+class Rollback(Exception):
+    """Raised to discard the benchmark users."""
+
+class Command(BaseCommand):
+    help = (
+        "Measure profile search latency: DRF SearchFilter (icontains) against the "
+        "full-text and trigram backend. PostgreSQL only; runs in a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000, help="Users created for the run")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per query and backend")
+        parser.add_argument("--seed", type=int, default=42, help="Seed for the generated names")
+
+    def create_users(self, count: int, rng: random.Random) -> List[Dict[str, Any]]:
+        people = []
+        for start in range(0, count, 5000):
+            batch = []
+            for i in range(start, min(start + 5000, count)):
+                last_name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+                user = User(
+                    username=f"SEARCH-{i:08d}",
+                    email=f"bench-search-{i}@example.com",
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=last_name,
+                    id_no=30_000_000 + i,
+                    security_question=User.SecurityQuestions.BIRTH_CITY,
+                    security_answer="bench",
+                )
+                user.set_unusable_password()
+                batch.append(user)
+            User.objects.bulk_create(batch)
+            people += [{"first": user.first_name, "last": user.last_name, "id_no": user.id_no} for user in batch]
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(User._meta.db_table)}")
+        return people
+
+    def icontains_search(self, terms: List[str]) -> QuerySet:
+        """What DRF's SearchFilter did with the old search_fields."""
+        fields = ["first_name", "last_name", "id_no"]
+        return User.objects.filter(
+            reduce(and_, (reduce(or_, (Q(**{f"{field}__icontains": term}) for field in fields)) for term in terms))
+        )
+
+    def queries(self, people: List[Dict[str, Any]], rng: random.Random) -> Dict[str, List[str]]:
+        person = rng.choice(people)
+        last = person["last"]
+        middle = len(last) // 2
+        return {
+            "last name": [last],
+            "full name": [person["first"], last],
+            "prefix": [last[:3]],
+            "typo": [last[:middle] + last[middle + 1:]],
+            "id prefix": [str(person["id_no"])[:6]],
+        }
+
+    def time_query(self, build: Callable[[], QuerySet], repeat: int) -> tuple:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            page = list(build()[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return statistics.median(timings), timings[math.ceil(len(timings) * 0.95) - 1], page
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("Search benchmarks need PostgreSQL")
+        if options["users"] < 1 or options["repeat"] < 1:
+            raise CommandError("--users and --repeat must be positive")
+
+        rng = random.Random(options["seed"])
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                people = self.create_users(options["users"], rng)
+                self.stdout.write(f"Created {len(people):,} users in {time.perf_counter() - started:.1f}s")
+
+                self.stdout.write(f"{'query':>10} {'terms':>22} {'backend':>10} {'p50 ms':>8} {'p95 ms':>8}  top hit")
+                for label, terms in self.queries(people, rng).items():
+                    for backend, build in (
+                        ("icontains", lambda: self.icontains_search(terms)),
+                        ("search", lambda: search_users(User.objects.all(), terms)),
+                    ):
+                        p50, p95, page = self.time_query(build, options["repeat"])
+                        top_hit = f"{page[0].first_name} {page[0].last_name} ({page[0].id_no})" if page else "-"
+                        self.stdout.write(
+                            f"{label:>10} {' '.join(terms):>22} {backend:>10} {p50:8.2f} {p95:8.2f}  {top_hit}"
+                        )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,71 @@
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core_apps.teacher_profile.models import Profile as TeacherProfile
+from core_apps.teacher_profile.utils import issue_teacher_empIds
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = "Create users (and their role profiles) in bulk from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row, or JSONL file with one user object per line")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format; defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=500, help="Users hashed and inserted per chunk")
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing workers (default: CPU count)")
+
+    def read_rows(self, path: Path, file_format: str) -> Iterator[Dict[str, Any]]:
+        with path.open(newline="", encoding="utf-8") as handle:
+            if file_format == "csv":
+                for row in csv.DictReader(handle):
+                    yield {field: value for field, value in row.items() if value not in ("", None)}
+            else:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def issue_employee_ids(self, batch_size: int) -> int:
+        """Give every teacher profile without an employee ID one, a batch at a time."""
+        pending = TeacherProfile.objects.filter(employee_id__isnull=True).only("pk", "employee_id").order_by("pk")
+        issued = 0
+        while batch := list(pending[:batch_size]):
+            assigned = issue_teacher_empIds(batch)
+            if len(assigned) < len(batch):
+                raise CommandError(f"Could not issue employee IDs to {len(batch) - len(assigned)} teacher(s)")
+            issued += len(assigned)
+        return issued
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"File not found: {path}")
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ("csv", "jsonl"):
+            raise CommandError("Cannot tell the input format; pass --format csv or --format jsonl")
+
+        started = time.perf_counter()
+        try:
+            stats = User.objects.bulk_create_users(
+                self.read_rows(path, file_format),
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+            )
+            employee_ids = self.issue_employee_ids(options["batch_size"])
+        except (ValueError, ValidationError) as e:
+            raise CommandError(f"Onboarding stopped: {e}")
+        elapsed = time.perf_counter() - started
+
+        rate = stats["users"] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {stats['users']} users and {stats['profiles']} profiles in {elapsed:.2f}s "
+            f"({rate:.1f} users/s; hashing {stats['hash_seconds']:.2f}s, inserting {stats['insert_seconds']:.2f}s); "
+            f"issued {employee_ids} employee IDs"
+        ))
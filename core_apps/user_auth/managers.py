@@ -3,38 +3,142 @@ Custom user manager for handling user creation and authentication in the school
 This module provides functionality for creating regular users and superusers with email-based authentication.
 """
 
-from random import choices
+import multiprocessing
 import string
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
 from os import getenv
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
+import django
+from django.apps import apps
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import UserManager as DjangoUserManager
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
+from .lockout import locked_out_q
+
+
+BASE36_ALPHABET = string.digits + string.ascii_uppercase
+
+# User fields an onboarding row may set; usernames are always generated
+IMPORT_FIELDS = frozenset({
+    "email", "password", "id_no", "first_name", "middle_name", "last_name",
+    "security_question", "security_answer", "account_status", "role",
+})
+
+
+def to_base36(number: int) -> str:
+    """Encode a non-negative integer in uppercase base36."""
+    encoded = ""
+    while True:
+        number, remainder = divmod(number, 36)
+        encoded = BASE36_ALPHABET[remainder] + encoded
+        if not number:
+            return encoded
+
+
+def get_username_prefix() -> str:
+    """Return the school initials used to prefix usernames, e.g. "OS" for "Outshine School"."""
+    school_name = getenv("SCHOOL_NAME")
+    words = school_name.split()
+    return "".join([word[0] for word in words]).upper()
+
+
+class UsernameAllocator:
+    """
+    Hands out sequential usernames from blocks reserved on a shared counter.
+    
+    Format: [SCHOOL_INITIALS]-[BASE36 NUMBER], e.g. "OS-0000002S"
+    
+    Each process reserves `block_size` numbers at a time with one atomic
+    INCRBY on the Redis counter, so usernames never collide and generating
+    one is O(1) without touching the database. The single dash after the
+    initials keeps these names apart from the older random "OS--..." names.
+    If the counter is missing (for example after Redis lost its data), it is
+    re-seeded from the highest sequential username in the users table plus a
+    margin of `block_size` numbers for each of USERNAME_MAX_WORKERS
+    processes. Blocks other processes reserved before the loss may not be in
+    the table yet; skipping past them keeps those from being issued twice.
+    """
+    counter_key = "username-counter"
+    width = 8
+
+    def __init__(self, block_size: Optional[int] = None) -> None:
+        self.block_size = block_size or getattr(settings, "USERNAME_BLOCK_SIZE", 100)
+        self.reseed_margin = self.block_size * getattr(settings, "USERNAME_MAX_WORKERS", 100)
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "USERNAME_CACHE_ALIAS", "default")]
+
+    def format(self, number: int) -> str:
+        return f"{get_username_prefix()}-{to_base36(number).rjust(self.width, '0')}"
+
+    def _seed(self) -> int:
+        """Find the highest number already issued, from the users table."""
+        prefix = f"{get_username_prefix()}-"
+        user_model = apps.get_model(settings.AUTH_USER_MODEL)
+        latest = (
+            user_model._default_manager.filter(username__startswith=prefix)
+            .exclude(username__startswith=f"{prefix}-")
+            .order_by("-username")
+            .values_list("username", flat=True)
+            .first()
+        )
+        return int(latest[len(prefix):], 36) if latest else 0
+
+    def reserve(self, count: int) -> range:
+        """Atomically reserve `count` consecutive numbers on the shared counter."""
+        try:
+            end = self.cache.incr(self.counter_key, count)
+        except ValueError:
+            self.cache.add(self.counter_key, self._seed() + self.reseed_margin, timeout=None)
+            end = self.cache.incr(self.counter_key, count)
+        return range(end - count + 1, end + 1)
+
+    def allocate(self) -> str:
+        """Return the next username from this process's reserved block."""
+        with self._lock:
+            if self._next >= self._end:
+                block = self.reserve(self.block_size)
+                self._next, self._end = block.start, block.stop
+            number = self._next
+            self._next += 1
+        return self.format(number)
+
+    def allocate_many(self, count: int) -> List[str]:
+        """Reserve and return `count` usernames with a single counter round-trip."""
+        return [self.format(number) for number in self.reserve(count)]
+
+
+username_allocator = UsernameAllocator()
+
 
 def generate_username() -> str:
     """
-    Generate a unique username based on school name and random characters.
+    Generate a unique username based on school name and a sequential number.
     
-    Format: [SCHOOL_INITIALS]--[RANDOM_CHARS]
-    Example: If school name is "Outshine School", username might be "OS--A1B2C3D4E5"
+    Format: [SCHOOL_INITIALS]-[BASE36 NUMBER]
+    Example: If school name is "Outshine School", username might be "OS-0000002S"
     
     Returns:
-        str: A unique username string of maximum length 15 characters
+        str: A unique username string
     """
-    school_name = getenv("SCHOOL_NAME")
-    words = school_name.split()
-    # Get initials from school name
-    prefix = "".join([word[0] for word in words]).upper()
-    # Calculate remaining length for random characters
-    remaining_length = 12 - len(prefix) - 1
-    # Generate random alphanumeric string
-    random_chars = "".join(choices(string.ascii_uppercase + string.digits, k=remaining_length))
-    username = f"{prefix}--{random_chars}"
-    return username
+    return username_allocator.allocate()
 
 
 def validate_email_address(email: str) -> None:
@@ -56,11 +160,54 @@ def validate_email_address(email: str) -> None:
         )
 
 
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the default hasher (Argon2).
+    
+    Module-level so it can be sent to process pool workers.
+    """
+    return make_password(password)
+
+
+def setup_hashing_worker() -> None:
+    """Make sure Django is configured in a password hashing worker process."""
+    django.setup()
+
+
+def get_hashing_executor(workers: Optional[int] = None) -> Executor:
+    """
+    Return the pool passwords are hashed in.
+
+    Daemonic processes (such as Celery's prefork pool children) may not
+    start child processes, so there passwords are hashed in a thread pool
+    instead; argon2-cffi releases the GIL while hashing.
+    """
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=setup_hashing_worker)
+
+
+def chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most `size` items from `rows`."""
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 class UserManager(DjangoUserManager):
     """
     Custom user manager for handling user operations with email-based authentication.
     Extends Django's default UserManager with custom user creation logic.
     """
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Leave the name search vector out of user loads.
+
+        Only search queries use it, and they reference the column in SQL;
+        loading it would cost every user fetch and every cached user.
+        """
+        return super().get_queryset().defer("search_vector")
     
     def _create_user(self, email: str, password: str, **extra_fields: Any):
         """
@@ -134,4 +281,172 @@ class UserManager(DjangoUserManager):
         if extra_fields.get("is_superuser") is not True:
             raise ValueError(_("Superuser must have is_superuser=True."))
             
-        return self._create_user(email, password, **extra_fields)
\ No newline at end of file
+        return self._create_user(email, password, **extra_fields)
+
+    def locked_out(self, now: Optional[datetime] = None):
+        """
+        Users whose account lock is still in effect at `now`.
+
+        Evaluates lockout state for many users in one query, with the same
+        rule as User.is_locked_out.
+        """
+        return self.filter(locked_out_q(now))
+
+    def _clean_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check an onboarding row's columns and convert their values.
+
+        Blank cells are dropped, so the field's default applies.
+
+        Raises:
+            ValueError: If the row has a column outside IMPORT_FIELDS
+            ValidationError: If a value is invalid for its field
+        """
+        unknown = set(row) - IMPORT_FIELDS
+        if unknown:
+            raise ValueError(_("Unknown columns: %(columns)s") % {"columns": ", ".join(sorted(unknown))})
+
+        fields = {}
+        for name, value in row.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if value in ("", None):
+                continue
+            if name != "password":
+                value = self.model._meta.get_field(name).clean(value, None)
+            fields[name] = value
+        return fields
+
+    def _build_user(self, row: Dict[str, Any], username: str):
+        """
+        Build an unsaved user from an onboarding row, without hashing its password.
+        
+        Raises:
+            ValueError: If email or password is missing, or a column is unknown
+            ValidationError: If the email address or another value is invalid
+        """
+        extra_fields = self._clean_row(row)
+        email = extra_fields.pop("email", None)
+        password = extra_fields.pop("password", None)
+        if not email:
+            raise ValueError(_("The email must be provided"))
+        if not password:
+            raise ValueError(_("A password must be provided"))
+
+        email = self.normalize_email(email)
+        validate_email_address(email)
+        user = self.model(username=username, email=email, is_superuser=False, is_staff=False, **extra_fields)
+        return user, password
+
+    def _build_profiles(self, users: List[Any]) -> Dict[Any, List[Any]]:
+        """
+        Build the unsaved profiles for users whose role has a profile model.
+        
+        The role to model mapping comes from settings.ROLE_PROFILE_MODELS.
+        Each user gets the profile of its own role only. The post_save
+        handlers in teacher_profile.signals and parent_profile.signals, when
+        connected, instead create a profile of their model for every new
+        user whatever its role; bulk inserts skip them.
+
+        Profile models with a unique `slug` get the slugified username,
+        which is unique as well.
+        """
+        profiles: Dict[Any, List[Any]] = {}
+        for role, model_label in getattr(settings, "ROLE_PROFILE_MODELS", {}).items():
+            profile_model = apps.get_model(model_label)
+            field_names = {field.name for field in profile_model._meta.concrete_fields}
+            profiles[profile_model] = [
+                profile_model(user=user, **({"slug": slugify(user.username)} if "slug" in field_names else {}))
+                for user in users
+                if user.role == role
+            ]
+        return profiles
+
+    def _check_unique(self, users: List[Any], first_row: int) -> None:
+        """
+        Check a chunk's unique columns against each other and the users table.
+
+        Raises:
+            ValueError: Naming the first row whose email, id_no or username is taken
+        """
+        for field in ("email", "id_no", "username"):
+            values = [getattr(user, field) for user in users]
+            taken = set(self.filter(**{f"{field}__in": values}).values_list(field, flat=True))
+            seen = set()
+            for row_number, value in enumerate(values, first_row):
+                if value in taken or value in seen:
+                    raise ValueError(
+                        _("Row %(row)d: a user with %(field)s %(value)s already exists")
+                        % {"row": row_number, "field": field, "value": value}
+                    )
+                seen.add(value)
+
+    def bulk_create_users(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        batch_size: int = 500,
+        workers: Optional[int] = None,
+    ) -> Dict[str, float]:
+        """
+        Create many users, and their role profiles, in chunks.
+        
+        Passwords of each chunk are hashed in parallel (see
+        get_hashing_executor()); users and profiles are then inserted with
+        bulk_create inside one transaction per chunk.
+        
+        Args:
+            rows: Dicts of user fields (see IMPORT_FIELDS), each including
+                "email" and "password"
+            batch_size: Number of users hashed and inserted per chunk
+            workers: Number of hashing workers (defaults to the CPU count)
+            
+        Returns:
+            Dict[str, float]: Counts of created users and profiles and the
+            seconds spent hashing and inserting
+
+        Raises:
+            ValueError: If a row is invalid or duplicates an existing user;
+                the message gives its 1-based number. Chunks before it have
+                been inserted.
+        """
+        stats = {"users": 0, "profiles": 0, "hash_seconds": 0.0, "insert_seconds": 0.0}
+        with get_hashing_executor(workers) as pool:
+            for chunk_index, chunk in enumerate(chunked(rows, batch_size)):
+                first_row = chunk_index * batch_size + 1
+                usernames = username_allocator.allocate_many(len(chunk))
+                built = []
+                for row_number, (row, username) in enumerate(zip(chunk, usernames), first_row):
+                    try:
+                        built.append(self._build_user(row, username))
+                    except ValidationError as e:
+                        raise ValueError(_("Row %(row)d: %(error)s") % {"row": row_number, "error": "; ".join(e.messages)}) from e
+                    except ValueError as e:
+                        raise ValueError(_("Row %(row)d: %(error)s") % {"row": row_number, "error": e}) from e
+                users, passwords = zip(*built)
+                # Checked before hashing, so a duplicate fails fast with its row number
+                self._check_unique(users, first_row)
+
+                started = time.perf_counter()
+                hashes = pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // 16))
+                for user, password_hash in zip(users, hashes):
+                    user.password = password_hash
+                stats["hash_seconds"] += time.perf_counter() - started
+
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=self._db):
+                        self.bulk_create(users, batch_size=batch_size)
+                        created_profiles = 0
+                        for profile_model, profiles in self._build_profiles(users).items():
+                            profile_model.objects.bulk_create(profiles, batch_size=batch_size)
+                            created_profiles += len(profiles)
+                except IntegrityError as e:
+                    # A user created by someone else since _check_unique()
+                    raise ValueError(
+                        _("Rows %(first)d-%(last)d: %(error)s")
+                        % {"first": first_row, "last": first_row + len(users) - 1, "error": e}
+                    ) from e
+                stats["profiles"] += created_profiles
+                stats["insert_seconds"] += time.perf_counter() - started
+                stats["users"] += len(users)
+        return stats
@@ -1,25 +1,33 @@
 # Standard library imports
 import uuid
+from typing import Any, Set
 
 # Django imports
 from django.db import models
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models.functions import Cast
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from autoslug import AutoSlugField
 
 # Local imports
-from .emails import send_account_locked_email
+from core_apps.common.dirty_fields import DirtyFieldsMixin
+from core_apps.common.user_cache import invalidate_cached_user
+from .fields import ChangeAwareAutoSlugField
+from .lockout import clear_failed_logins, lockout_cutoff, register_failed_login
 from .managers import UserManager
+from .otp import get_otp_backend
 
-class User(AbstractUser):
+class User(DirtyFieldsMixin, AbstractUser):
     """
     Custom User model for the school management system.
     Extends Django's AbstractUser to add school-specific functionality.
     
     This model handles user authentication, role management, and security features
-    including OTP verification and account locking mechanisms.
+    including OTP verification and account locking mechanisms. OTP codes are kept
+    in the OTP backend (see otp.py) rather than on the user row.
     """
     
     class SecurityQuestions(models.TextChoices):
@@ -134,7 +142,7 @@ class User(AbstractUser):
         help_text=_("User's role in the school system")
     )
 
-    slug = AutoSlugField(
+    slug = ChangeAwareAutoSlugField(
         populate_from="username",
         unique=True,
         always_update=True,
@@ -153,82 +161,55 @@ class User(AbstractUser):
         help_text=_("Timestamp of the last failed login attempt")
     )
     
-    # OTP authentication fields
-    otp = models.CharField(
-        _("one-time password"),
-        max_length=6,
-        null=True,
-        blank=True,
-        help_text=_("Temporary code for two-factor authentication")
-    )
-    otp_expiry_time = models.DateTimeField(
-        _("OTP expiry time"),
-        null=True,
-        blank=True,
-        help_text=_("Timestamp when the current OTP expires")
+    # Name search (see common/search.py), kept up to date by PostgreSQL
+    search_vector = models.GeneratedField(
+        expression=SearchVector("first_name", "last_name", weight="A", config="simple")
+        + SearchVector("middle_name", weight="B", config="simple"),
+        output_field=SearchVectorField(),
+        db_persist=True,
     )
 
     # Model configuration
     objects = UserManager()
     USERNAME_FIELD = "email"  # Use email as the primary login identifier
     REQUIRED_FIELDS = ["first_name", "last_name", "id_no", "security_question", "security_answer"]
-    
-    def set_otp(self, otp: str) -> None:
+
+    def get_update_fields(self, dirty_fields: Set[str]) -> Set[str]:
         """
-        Sets a new One-Time Password (OTP) for the user with an expiry time.
-        
-        Args:
-            otp (str): The 6-digit OTP code to be set
-            
-        The OTP expiry time is calculated by adding settings.OTP_EXPIRY_TIME
-        to the current timestamp. After setting, the user instance is saved.
+        Adds the slug to the columns written when the username changed.
         """
-        self.otp = otp
-        self.otp_expiry_time = timezone.now() + settings.OTP_EXPIRY_TIME
-        self.save()
+        update_fields = super().get_update_fields(dirty_fields)
+        if "username" in update_fields:
+            update_fields.add("slug")
+        return update_fields
 
-    def verify_otp(self, otp: str) -> bool:
+    def save(self, *args: Any, **kwargs: Any) -> None:
         """
-        Verifies if the provided OTP matches and hasn't expired.
+        Saves the user, writing the slug along with the username.
         
-        Args:
-            otp (str): The OTP code to verify
-            
-        Returns:
-            bool: True if OTP matches and is still valid, False otherwise
-            
-        Side effects:
-            - On successful verification, clears the OTP and its expiry time
-            - Saves the user instance after clearing OTP data
+        Unchanged users are not written at all, and only changed columns
+        are updated (see DirtyFieldsMixin).
         """
-        if self.otp == otp and self.otp_expiry_time > timezone.now():
-            self.otp = ""
-            self.otp_expiry_time = None
-            self.save()
-            return True
-        return False
-
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "username" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "slug"}
+        super().save(*args, **kwargs)
+    
     def handle_failed_login_attempts(self) -> None:
         """
         Manages the failed login attempts counter and account locking.
         
-        Increments the failed login attempts counter and updates the last failed
-        login timestamp. If the number of attempts exceeds the maximum allowed,
-        locks the account and sends a notification email.
+        Failures are counted atomically in the cache within a sliding window
+        (see lockout.py). The user row is only written when the count reaches
+        settings.LOGIN_ATTEMPTS and the account is locked, in which case a
+        notification email is sent once.
         
         Side effects:
-            - Increments failed_login_attempts
-            - Updates last_failed_login timestamp
+            - Sets failed_login_attempts on the instance to the windowed count
             - May change account_status to LOCKED
             - Sends email notification if account is locked
         """
-        self.failed_login_attempts += 1
-        self.last_failed_login = timezone.now()
-        if self.failed_login_attempts >= settings.MAX_FAILED_LOGIN_ATTEMPTS:
-            self.account_status = self.AccountStatus.LOCKED
-            self.save()
-            send_account_locked_email(self)
-        self.save()
+        self.failed_login_attempts = register_failed_login(self)
 
     def reset_failed_login_attempts(self) -> None:
         """
@@ -237,11 +218,50 @@ class User(AbstractUser):
         Clears the failed login counter and timestamp, and sets the account
         status back to ACTIVE. Called after a successful login or manual reset.
         """
+        clear_failed_logins(self)
         self.failed_login_attempts = 0
         self.last_failed_login = None
         self.account_status = self.AccountStatus.ACTIVE
         self.save()
 
+    def start_otp_login(self, otp: str) -> None:
+        """
+        Resets the lockout counters and issues a new OTP for this login.
+        
+        Args:
+            otp (str): The 6-digit OTP code to be issued
+            
+        The cached failure counter is cleared, and the lockout columns are only
+        written, with one targeted UPDATE instead of save(), when they are not
+        already clean, so no post_save receivers run. The OTP itself is stored by the
+        configured OTP backend with settings.OTP_EXPIRY_TIME as its lifetime,
+        and never touches the users table.
+        """
+        clear_failed_logins(self)
+        login_state = {
+            "failed_login_attempts": 0,
+            "last_failed_login": None,
+            "account_status": self.AccountStatus.ACTIVE,
+        }
+        if any(getattr(self, field) != value for field, value in login_state.items()):
+            type(self).objects.filter(pk=self.pk).update(**login_state)
+            invalidate_cached_user(self.pk)
+            for field, value in login_state.items():
+                setattr(self, field, value)
+        get_otp_backend().issue(self.email, otp)
+
+    def verify_otp(self, otp: str) -> bool:
+        """
+        Verifies and consumes the OTP issued for this user.
+        
+        Args:
+            otp (str): The OTP code to verify
+            
+        Returns:
+            bool: True if OTP matches and is still valid, False otherwise
+        """
+        return get_otp_backend().verify(self.email, otp)
+
     def unlock_account(self) -> None:
         """
         Unlocks a locked account by resetting security tracking fields.
@@ -264,15 +284,12 @@ class User(AbstractUser):
             bool: True if account is locked and lockout period hasn't expired,
                  False otherwise
                  
-        Side effects:
-            - May unlock the account if the lockout duration has expired
+        This is a pure read: expired locks are reset in bulk by the
+        unlock_expired_accounts task, and on the account's next login.
         """
-        if self.account_status == self.AccountStatus.LOCKED:
-            if(self.last_failed_login and (timezone.now() - self.last_failed_login) > settings.LOCKOUT_DURATION):
-                self.unlock_account()
-                return False
-            return True
-        return False
+        if self.account_status != self.AccountStatus.LOCKED:
+            return False
+        return self.last_failed_login is None or self.last_failed_login > lockout_cutoff()
 
     @property
     def full_name(self) -> str:
@@ -311,4 +328,14 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _("User")
         verbose_name_plural = _("Users")
-        ordering = ["-date_joined"]
\ No newline at end of file
+        ordering = ["-date_joined"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="user_search_vector_idx"),
+            GinIndex(fields=["first_name"], opclasses=["gin_trgm_ops"], name="user_first_name_trgm_idx"),
+            GinIndex(fields=["last_name"], opclasses=["gin_trgm_ops"], name="user_last_name_trgm_idx"),
+            # id_no prefix lookups: id_no::text LIKE '123%'
+            models.Index(
+                OpClass(Cast("id_no", output_field=models.TextField()), name="text_pattern_ops"),
+                name="user_id_no_prefix_idx",
+            ),
+        ]
\ No newline at end of file
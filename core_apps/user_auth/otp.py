@@ -0,0 +1,132 @@
+"""
+Storage backends for login One-Time Passwords (OTP).
+
+Codes are kept out of the users table: each backend stores one live code per
+email address with a native expiry, so issuing a code costs no table writes
+and verifying it is a single keyed lookup. The backend in use is selected by
+the OTP_BACKEND setting.
+"""
+
+import hashlib
+import threading
+import time
+from functools import lru_cache
+from secrets import compare_digest
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class BaseOTPBackend:
+    """
+    Interface shared by all OTP storage backends.
+
+    Issuing a code for an email replaces any code issued before it, and a
+    code can be verified successfully only once.
+    """
+    key_prefix = "otp"
+
+    def make_key(self, email: str) -> str:
+        """
+        Build the storage key for an email address.
+
+        The address is hashed so raw emails never appear in the key space.
+        """
+        digest = hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}:{digest}"
+
+    def get_timeout(self) -> int:
+        """Return the OTP lifetime in seconds, taken from settings.OTP_EXPIRY_TIME."""
+        return int(settings.OTP_EXPIRY_TIME.total_seconds())
+
+    def issue(self, email: str, otp: str) -> None:
+        """Store a new OTP for the email, replacing any earlier code."""
+        raise NotImplementedError
+
+    def verify(self, email: str, otp: str) -> bool:
+        """
+        Check and consume the OTP for the email.
+
+        Returns:
+            bool: True if the code matched and had not expired, False otherwise
+        """
+        raise NotImplementedError
+
+    def discard(self, email: str) -> None:
+        """Remove any live OTP for the email."""
+        raise NotImplementedError
+
+
+class CacheOTPBackend(BaseOTPBackend):
+    """
+    Stores OTPs in a Django cache, by default the django-redis cache.
+
+    Redis expires the key on its own once the OTP lifetime has passed, and
+    the DELETE that consumes a code decides which request wins when the same
+    code is submitted concurrently.
+    """
+
+    def __init__(self, alias: Optional[str] = None) -> None:
+        self.cache = caches[alias or getattr(settings, "OTP_CACHE_ALIAS", "default")]
+
+    def issue(self, email: str, otp: str) -> None:
+        self.cache.set(self.make_key(email), otp, timeout=self.get_timeout())
+
+    def verify(self, email: str, otp: str) -> bool:
+        key = self.make_key(email)
+        stored = self.cache.get(key)
+        if stored is None or not compare_digest(str(stored), str(otp)):
+            return False
+        return bool(self.cache.delete(key))
+
+    def discard(self, email: str) -> None:
+        self.cache.delete(self.make_key(email))
+
+
+class InMemoryOTPBackend(BaseOTPBackend):
+    """
+    Process-local OTP store for tests and single-process development.
+
+    Entries carry their own expiry deadline and are dropped lazily when read.
+    """
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def issue(self, email: str, otp: str) -> None:
+        with self._lock:
+            self._codes[self.make_key(email)] = (otp, time.monotonic() + self.get_timeout())
+
+    def verify(self, email: str, otp: str) -> bool:
+        key = self.make_key(email)
+        with self._lock:
+            stored = self._codes.get(key)
+            if stored is None:
+                return False
+            code, expires_at = stored
+            if expires_at <= time.monotonic():
+                del self._codes[key]
+                return False
+            if not compare_digest(code, str(otp)):
+                return False
+            del self._codes[key]
+            return True
+
+    def discard(self, email: str) -> None:
+        with self._lock:
+            self._codes.pop(self.make_key(email), None)
+
+
+@lru_cache(maxsize=None)
+def get_otp_backend() -> BaseOTPBackend:
+    """
+    Return the configured OTP backend instance.
+
+    The class is read from settings.OTP_BACKEND and instantiated once per
+    process.
+    """
+    backend_path = getattr(settings, "OTP_BACKEND", "core_apps.user_auth.otp.CacheOTPBackend")
+    return import_string(backend_path)()
@@ -1,6 +1,11 @@
 from django.contrib.auth import get_user_model
 from djoser.serializers import (UserCreateSerializer as DjoserUserCreateSerializer, UserSerializer as DjoserUserSerializer)
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from core_apps.common.token_denylist import is_token_revoked, revoke_token
 
 User = get_user_model()
 
@@ -44,3 +49,18 @@ class CustomUserSerializer(DjoserUserSerializer):
         ]
     
         read_only_fields = ["id", "username", "email"]
+
+class DenylistTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_token_revoked(refresh):
+            raise InvalidToken("Token has been revoked")
+
+        data = super().validate(attrs)
+
+        # A rotated refresh token must not be usable a second time. Revoking
+        # is atomic, so of two concurrent refreshes only the one that revoked
+        # the token gets the new pair.
+        if api_settings.ROTATE_REFRESH_TOKENS and not revoke_token(refresh):
+            raise InvalidToken("Token has been revoked")
+        return data
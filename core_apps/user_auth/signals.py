@@ -0,0 +1,20 @@
+from typing import Any
+from django.db.models.base import Model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.conf import settings
+
+from core_apps.common.user_cache import invalidate_cached_user
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_cache(sender: type[Model], instance: Model, **kwargs: Any) -> None:
+    """
+    Signal handler to drop the cached authenticated user when the User changes.
+    
+    Args:
+        sender: The model class (User)
+        instance: The actual instance being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    invalidate_cached_user(instance.pk)
@@ -0,0 +1,12 @@
+from celery import shared_task
+from loguru import logger
+
+from .lockout import unlock_expired_accounts
+
+@shared_task(name="unlock_expired_accounts")
+def unlock_expired_accounts_task() -> int:
+    """Periodic task: reactivate every account whose lockout has expired."""
+    unlocked = unlock_expired_accounts()
+    if unlocked:
+        logger.info(f"Unlocked {unlocked} accounts with expired lockouts")
+    return unlocked
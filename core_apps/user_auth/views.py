@@ -1,7 +1,6 @@
 from typing import Any, Optional
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 from djoser.views import TokenCreateView
 from djoser.views import User
 from loguru import logger
@@ -9,10 +8,14 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from core_apps.common.throttling import AnonTokenBucketThrottle, LoginRateThrottle, OTPVerifyRateThrottle
+from core_apps.common.token_denylist import revoke_token
 from .emails import send_otp_email
+from .serializers import DenylistTokenRefreshSerializer
 from .utils import generate_otp
 
 User = get_user_model()
@@ -38,6 +41,8 @@ def set_auth_cookies(response: Response, access_token: str, refresh_token: Optio
     response.set_cookie("logged_in", "true", **logged_in_cookie_settings)
 
 class CustomTokenCreateView(TokenCreateView):
+    throttle_classes = [AnonTokenBucketThrottle, LoginRateThrottle]
+
     def _action(self, serializer):
         user = serializer.user
         if user.is_locked_out:
@@ -48,10 +53,8 @@ class CustomTokenCreateView(TokenCreateView):
                 status=status.HTTP_403_FORBIDDEN,
             )
         
-        user.reset_failed_login_attempts()
-
         otp = generate_otp()
-        user.set_otp(otp)
+        user.start_otp_login(otp)
         send_otp_email(user.email, otp)
 
         logger.info(f"OTP sent to {user.email}")
@@ -98,8 +101,10 @@ class CustomTokenCreateView(TokenCreateView):
         return self._action(serializer)
 
 class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = DenylistTokenRefreshSerializer
+
     def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        refresh_token = request.data.get("refresh")
+        refresh_token = request.data.get("refresh") or request.COOKIES.get("refresh")
 
         if refresh_token:
             request.data["refresh"] = refresh_token
@@ -129,13 +134,15 @@ class CustomTokenRefreshView(TokenRefreshView):
 
 class OTPVerifyView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [AnonTokenBucketThrottle, OTPVerifyRateThrottle]
 
     def post(self, request):
+        email = request.data.get("email")
         otp = request.data.get("otp")
-        if not otp:
-            return Response({"error": "OTP not provided"}, status=status.HTTP_400_BAD_REQUEST)
+        if not email or not otp:
+            return Response({"error": "Email and OTP are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = User.objects.filter(otp=otp, otp_expiry_time__gt=timezone.now()).first()
+        user = User.objects.filter(email=email).first()
         if not user:
             return Response({"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -147,7 +154,8 @@ class OTPVerifyView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        user.verify_otp(otp)
+        if not user.verify_otp(otp):
+            return Response({"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
 
         refresh = RefreshToken.for_user(user)
         access_token = str(refresh.access_token)
@@ -166,6 +174,16 @@ class OTPVerifyView(APIView):
 
 class LogoutAPIView(APIView):
     def post(self, request, *args, **kwargs):
+        if request.auth is not None:
+            revoke_token(request.auth)
+
+        refresh_token = request.COOKIES.get("refresh")
+        if refresh_token:
+            try:
+                revoke_token(RefreshToken(refresh_token))
+            except TokenError:
+                pass
+
         response = Response(status=status.HTTP_204_NO_CONTENT)
         response.delete_cookie("access")
         response.delete_cookie("refresh")
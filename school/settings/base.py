@@ -28,6 +28,7 @@ DJANGO_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.sites',
     'django.contrib.humanize',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -55,6 +56,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'core_apps.common.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,7 +64,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'core_apps.user_auth.middleware.CustomHeaderMiddleware',
 ]
 
 ROOT_URLCONF = 'school.urls'
@@ -148,13 +149,37 @@ SITE_ID = 1
 STATIC_URL = '/static/'
 STATIC_ROOT = str(BASE_DIR / "staticfiles") 
 
+MEDIA_URL = "/media/"
+MEDIA_ROOT = str(BASE_DIR / "mediafiles" / "public")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": getenv("REDIS_URL", "redis://redis:6379/0"),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    }
+}
+
+# Login OTPs live in the cache with a native TTL instead of on the user row.
+# Use "core_apps.user_auth.otp.InMemoryOTPBackend" for tests.
+OTP_BACKEND = "core_apps.user_auth.otp.CacheOTPBackend"
+OTP_CACHE_ALIAS = "default"
+
 AUTH_USER_MODEL = "user_auth.User"
 
+# Profile model created for each role when users are onboarded in bulk
+ROLE_PROFILE_MODELS = {
+    "TEACHER": "teacher_profile.Profile",
+    "PARENT": "parent_profile.Profile",
+}
+
 DEFAULT_BIRTH_DATE = date(2005, 1, 1)
 DEFAULT_DATE = date(2000, 1, 1)
 DEFAULT_EXPIRY_DATE = date(2025, 1, 1)
@@ -175,12 +200,14 @@ REST_FRAMEWORK = {
     ],
     "PAGE_SIZE": 10,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "core_apps.common.throttling.AnonTokenBucketThrottle",
+        "core_apps.common.throttling.UserTokenBucketThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "50/day",
         "user": "100/day",
+        "login": "5/min",
+        "verify_otp": "5/min",
     },
 }
 
@@ -193,6 +220,30 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
 }
 
+# Authenticated users are cached briefly so each API request can skip the
+# users table lookup; saves and lockout updates invalidate the entry.
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Revoked JWTs are tracked in Redis; each process checks a bloom filter kept
+# current by a background thread, which also rebuilds it from the denylist
+# every TOKEN_DENYLIST_SYNC_INTERVAL seconds to drop expired tokens.
+TOKEN_DENYLIST_CAPACITY = 100_000
+TOKEN_DENYLIST_ERROR_RATE = 0.001
+TOKEN_DENYLIST_SYNC_INTERVAL = 5
+
+# Throttle buckets are kept in Redis so every worker shares the same limits.
+THROTTLE_CACHE_ALIAS = "default"
+
+# Requests slower than SLOW_REQUEST_THRESHOLD seconds are sampled into a
+# capped Redis list, readable at /api/v1/monitoring/slow-requests/.
+SLOW_REQUEST_THRESHOLD = 0.5
+SLOW_REQUEST_SAMPLE_RATE = 1.0
+SLOW_REQUEST_BUFFER_SIZE = 100
+
+# Server-Timing headers are sent with DEBUG on and to staff users; set this to
+# send them on every response.
+SERVER_TIMING_HEADER = False
+
 DJOSER = {
     "USER_ID_FIELD": "id",
     "LOGIN_FIELD": "email",
@@ -234,9 +285,62 @@ CELERY_RESULT_EXTENDED = True
 CELERY_RESULT_BACKEND_ALWAYS_RETRY = True
 CELERY_TASK_TIME_LIMIT = 5 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60
-CELERY_BEAT_SCHEDULE = "django_celery_beat.schedulers:DatabaseScheduler"
+# Profile views are buffered in Redis and written to ContentView in batches
+# by flush_content_views; ContentView lags by up to one flush interval.
+# Unique viewer counts are HyperLogLog sketches on the same Redis, checked
+# against ContentView daily by reconcile_unique_viewers.
+CONTENT_VIEW_BUFFER_ENABLED = True
+CONTENT_VIEW_BUFFER_CACHE_ALIAS = "default"
+CONTENT_VIEW_FLUSH_INTERVAL = timedelta(seconds=30)
+CONTENT_VIEW_FLUSH_BATCH_SIZE = 500
+
+# ContentView is rolled up into daily per-object counts (ContentViewDaily),
+# which the admin and analytics read. The lookback must cover the longest
+# the rollup task may be down; raw views are kept for whole months only.
+CONTENT_VIEW_ROLLUP_INTERVAL = timedelta(minutes=10)
+CONTENT_VIEW_ROLLUP_LOOKBACK = timedelta(days=2)
+CONTENT_VIEW_RETENTION_MONTHS = 6
+
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "unlock-expired-accounts": {
+        "task": "unlock_expired_accounts",
+        "schedule": timedelta(minutes=1),
+    },
+    "purge-staged-uploads": {
+        "task": "purge_staged_uploads",
+        "schedule": timedelta(hours=1),
+    },
+    "flush-content-views": {
+        "task": "flush_content_views",
+        "schedule": CONTENT_VIEW_FLUSH_INTERVAL,
+    },
+    "reconcile-unique-viewers": {
+        "task": "reconcile_unique_viewers",
+        "schedule": timedelta(days=1),
+    },
+    "rollup-content-views": {
+        "task": "rollup_content_views",
+        "schedule": CONTENT_VIEW_ROLLUP_INTERVAL,
+    },
+    "purge-content-views": {
+        "task": "purge_content_views",
+        "schedule": timedelta(days=1),
+    },
+}
 CELERY_WORKER_SEND_TASK_EVENTS = True
 
+# Uploaded photos are streamed here and handed to workers by file name, so
+# the directory must be shared by the api and celeryworker containers.
+UPLOAD_STAGING_ROOT = getenv("UPLOAD_STAGING_ROOT", str(BASE_DIR / "mediafiles" / "staging"))
+UPLOAD_STAGING_MAX_AGE = timedelta(days=1)
+
+# Where stored photos live. Files are content-addressed, so identical photos
+# are stored once. Use "core_apps.common.media_storage.LocalMediaStorage" to
+# keep media on disk under MEDIA_ROOT without calling Cloudinary.
+MEDIA_STORAGE_BACKEND = getenv("MEDIA_STORAGE_BACKEND", "core_apps.common.media_storage.CloudinaryMediaStorage")
+MEDIA_STORAGE_OPTIONS = {}
+
 CLOUDINARY_CLOUD_NAME = getenv("CLOUDINARY_NAME")
 CLOUDINARY_API_KEY = getenv("CLOUDINARY_API_KEY")
 CLOUDINARY_API_SECRET = getenv("CLOUDINARY_API_SECRET")
@@ -257,6 +361,9 @@ COOKIE_HTTPONLY = True
 
 COOKIE_SECURE = getenv("COOKIE_SECURE", "True") == "True"
 
+# Raise instead of logging when a view exceeds its query_budget.
+QUERY_BUDGET_STRICT = getenv("QUERY_BUDGET_STRICT", "False") == "True"
+
 LOGGING_CONFIG = None
 
 LOGURU_LOGGING = {
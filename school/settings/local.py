@@ -21,6 +21,7 @@ ALLOWED_HOSTS = ["localhost", "127.0.0.1", "0.0.0.0"]
 ADMIN_URL = getenv("ADMIN_URL")
 
 EMAIL_BACKEND = "djcelery_email.backends.CeleryEmailBackend"
+CELERY_EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = getenv("EMAIL_HOST")
 EMAIL_PORT = getenv("EMAIL_PORT")
 DEFAULT_FROM_EMAIL = getenv("DEFAULT_FROM_EMAIL")
@@ -34,4 +35,6 @@ LOCKOUT_DURATION = timedelta(minutes=1)
 
 LOGIN_ATTEMPTS = 3
 
-OTP_EXPIRATION = timedelta(minutes=1)
+OTP_EXPIRY_TIME = timedelta(minutes=1)
+
+FAILED_LOGIN_WINDOW = timedelta(minutes=15)
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
@@ -17,8 +18,12 @@ urlpatterns = [
     path("api/v1/auth/", include('core_apps.user_auth.urls')),
     path("api/v1/teacher/", include('core_apps.teacher_profile.urls')),
     path("api/v1/parent/", include('core_apps.parent_profile.urls')),
+    path("api/v1/monitoring/", include('core_apps.common.urls')),
 ]
 
+# Serves LocalMediaStorage files in development (no-op when DEBUG is off)
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
 admin.site.site_header = "Outshine International School Admin"
 admin.site.site_title = "Outshine International School Admin Portal"
 admin.site.index_title = "Welcome to Outshine International School Admin Portal"
\ No newline at end of file